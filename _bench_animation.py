@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+動畫輸出格式效能比較工具
+比較 GIF、動態 WebP 與 APNG 的編碼時間與檔案大小
+用法: python _bench_animation.py [影片路徑] [最大寬度] [最多幀數]
+範例: python _bench_animation.py sample.mp4 480 120
+未指定影片時使用合成的測試畫面
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from src.animation import ANIMATION_EXTENSIONS, AnimationWriter
+from src.converter import VideoConverter
+
+# (名稱, 格式, AnimationWriter 參數；None = 以 Pillow 直接存檔)
+CASES = [
+    ("GIF (原始路徑，Pillow 存檔)", "gif", None),
+    ("GIF (預先量化，單執行緒)", "gif", {"workers": 1}),
+    ("GIF (平行量化)", "gif", {}),
+    ("WebP 有損 q=80", "webp", {"quality": 80}),
+    ("WebP 有損 q=50", "webp", {"quality": 50}),
+    ("WebP 無損", "webp", {"lossless": True}),
+    ("APNG", "apng", {}),
+]
+
+
+def load_frames(video_path: str | None, max_width: int, max_frames: int) -> list[Image.Image]:
+    """讀取影片幀，或產生合成測試畫面"""
+    if video_path is None:
+        frames = []
+        y, x = np.mgrid[0:270, 0:max_width]
+        for i in range(max_frames):
+            r = (x + i * 4) % 256
+            g = (y * 2 + i * 3) % 256
+            b = ((x + y) // 2 + i * 5) % 256
+            frames.append(Image.fromarray(np.dstack([r, g, b]).astype(np.uint8)))
+        return frames
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"無法開啟影片: {video_path}")
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(VideoConverter.frame_to_image(frame, max_width))
+    cap.release()
+    return frames
+
+
+def save_with_pillow(frames: list[Image.Image], output_path: str, duration: int):
+    """原本的 GIF 輸出方式：將 RGB 幀直接交給 Pillow 一次存檔（於存檔時單執行緒量化）"""
+    frames[0].save(
+        output_path,
+        save_all=True,
+        append_images=frames[1:],
+        duration=duration,
+        loop=0,
+        optimize=True,
+    )
+
+
+def run_benchmark(frames: list[Image.Image], fps: float = 10.0):
+    duration = int(1000 / fps)
+    print(f"{len(frames)} 幀，{frames[0].width}x{frames[0].height}")
+    print(f"{'格式':<28}{'時間 (秒)':>12}{'大小 (KB)':>14}{'相對 GIF':>12}")
+
+    baseline_size = None
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, output_format, options in CASES:
+            output_path = os.path.join(
+                temp_dir, f"bench_{len(os.listdir(temp_dir))}{ANIMATION_EXTENSIONS[output_format]}"
+            )
+            start = time.perf_counter()
+            if options is None:
+                save_with_pillow(frames, output_path, duration)
+            else:
+                with AnimationWriter(output_path, output_format, **options) as writer:
+                    for frame in frames:
+                        writer.append(frame, duration)
+            elapsed = time.perf_counter() - start
+
+            # 確認所有幀都寫入輸出檔（合成畫面每幀皆不同，不會被合併）
+            with Image.open(output_path) as result:
+                if getattr(result, "n_frames", 1) != len(frames):
+                    raise SystemExit(
+                        f"{name}: 輸出 {getattr(result, 'n_frames', 1)} 幀，應為 {len(frames)} 幀"
+                    )
+
+            size = os.path.getsize(output_path)
+            if baseline_size is None:
+                baseline_size = size
+            print(f"{name:<28}{elapsed:>12.2f}{size / 1024:>14.1f}{size / baseline_size:>11.0%}")
+
+
+if __name__ == "__main__":
+    video_path = sys.argv[1] if len(sys.argv) > 1 else None
+    max_width = int(sys.argv[2]) if len(sys.argv) > 2 else 480
+    max_frames = int(sys.argv[3]) if len(sys.argv) > 3 else 120
+
+    run_benchmark(load_frames(video_path, max_width, max_frames))
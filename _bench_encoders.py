@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+影片編碼設定檔效能比較工具
+列出每個容器與設定檔的編碼速度（fps）與輸出大小
+用法: python _bench_encoders.py [圖片資料夾] [最多幀數]
+範例: python _bench_encoders.py frames/ 300
+未指定資料夾時使用合成的測試畫面
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import imageio
+import numpy as np
+
+from src.encoder_profiles import PROFILES
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".webp", ".tiff", ".tif"}
+
+
+def load_frames(image_dir: str | None, max_frames: int) -> list[np.ndarray]:
+    """讀取資料夾內的圖片，或產生合成測試畫面（720p 移動漸層加雜訊）"""
+    if image_dir is None:
+        rng = np.random.default_rng(0)
+        y, x = np.mgrid[0:720, 0:1280]
+        frames = []
+        for i in range(max_frames):
+            base = np.dstack([(x + i * 4) % 256, (y + i * 2) % 256, (x + y + i * 6) // 2 % 256])
+            noise = rng.integers(0, 16, size=base.shape)
+            frames.append((base + noise).clip(0, 255).astype(np.uint8))
+        return frames
+
+    paths = sorted(p for p in Path(image_dir).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+    return [imageio.imread(p) for p in paths[:max_frames]]
+
+
+def run_benchmark(frames: list[np.ndarray], fps: float = 30.0):
+    height, width = frames[0].shape[:2]
+    print(f"{len(frames)} 幀，{width}x{height}")
+    print(f"{'容器':<8}{'設定檔':<10}{'編碼器':<14}{'編碼 fps':>10}{'大小 (KB)':>14}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for container, profiles in PROFILES.items():
+            for name, profile in profiles.items():
+                output_path = os.path.join(temp_dir, f"bench_{name}.{container}")
+                start = time.perf_counter()
+                writer = imageio.get_writer(output_path, fps=fps, **profile.writer_kwargs())
+                for frame in frames:
+                    writer.append_data(frame)
+                writer.close()
+                elapsed = time.perf_counter() - start
+
+                size = os.path.getsize(output_path)
+                print(
+                    f"{container:<8}{name:<10}{profile.codec:<14}"
+                    f"{len(frames) / elapsed:>10.1f}{size / 1024:>14.1f}"
+                )
+
+
+if __name__ == "__main__":
+    image_dir = sys.argv[1] if len(sys.argv) > 1 else None
+    max_frames = int(sys.argv[2]) if len(sys.argv) > 2 else 150
+
+    run_benchmark(load_frames(image_dir, max_frames))
@@ -0,0 +1,298 @@
+"""
+動畫輸出模組
+
+支援 GIF、動態 WebP 與 APNG，逐幀接收圖片並以執行緒池平行準備（解碼、縮放、量化）；
+保留的幀超過記憶體預算時改為逐幀寫入輸出檔
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from PIL import Image, ImageChops
+
+from .resources import GOVERNOR
+from .stream_writers import StreamWriter, open_stream_writer, remove_partial
+
+# 支援的動畫格式與對應副檔名
+ANIMATION_EXTENSIONS = {
+    "gif": ".gif",
+    "webp": ".webp",
+    "apng": ".png",
+}
+# Pillow 存檔時使用的格式名稱
+_PILLOW_FORMATS = {
+    "gif": "GIF",
+    "webp": "WEBP",
+    "apng": "PNG",
+}
+
+
+# 合併重複幀的預設門檻（32x32 灰階縮圖中差異最大一格的絕對差，0-255）
+DEFAULT_DEDUPE_THRESHOLD = 2.0
+# 重複幀比對用的縮圖尺寸
+_SIGNATURE_SIZE = (32, 32)
+# GIF 只有全透明或不透明，alpha 低於此值的像素視為透明
+_ALPHA_THRESHOLD = 128
+
+
+def default_workers() -> int:
+    """預設的幀準備執行緒數（依資源管理器分配給目前任務的執行緒數）"""
+    return GOVERNOR.threads()
+
+
+def quantize_frame(img: Image.Image, colors: int = 256, dither: bool = True) -> Image.Image:
+    """
+    依指定的顏色數與抖色設定將 RGB 或 RGBA 圖片量化為調色盤模式
+
+    預設設定（256 色、抖色）與 Pillow 存成 GIF 時的自動轉換相同，
+    因此可在背景執行緒中預先量化，而不改變輸出結果。
+    RGBA 圖片有透明像素時，以 colors - 1 色量化不透明的顏色，並保留一個透明色索引。
+
+    Args:
+        img: RGB 或 RGBA 圖片
+        colors: 調色盤顏色數（2-256，含透明色）
+        dither: 是否使用 Floyd-Steinberg 抖色
+
+    Returns:
+        量化後的圖片
+    """
+    if img.mode == "RGBA":
+        transparent = img.getchannel("A").point(lambda a: 255 if a < _ALPHA_THRESHOLD else 0)
+        if transparent.getbbox() is None:
+            return quantize_frame(img.convert("RGB"), colors, dither)
+        colors = max(2, min(colors, 256))
+        quantized = quantize_frame(img.convert("RGB"), colors - 1, dither)
+        palette = quantized.getpalette() or []
+        index = len(palette) // 3
+        quantized.putpalette(palette + [0, 0, 0])
+        quantized.paste(index, mask=transparent)
+        quantized.info["transparency"] = index
+        return quantized
+    if colors >= 256 and dither:
+        return img.convert("P", palette=Image.Palette.ADAPTIVE)
+    return img.quantize(
+        colors=max(2, min(colors, 256)),
+        dither=Image.Dither.FLOYDSTEINBERG if dither else Image.Dither.NONE,
+    )
+
+
+def frame_signature(img: Image.Image) -> Image.Image:
+    """計算用於比對重複幀的灰階縮圖"""
+    return img.convert("L").resize(_SIGNATURE_SIZE, Image.Resampling.BOX)
+
+
+def signature_distance(a: Image.Image, b: Image.Image) -> float:
+    """
+    兩張縮圖中差異最大一格的絕對差（0-255）
+
+    取最大值而非平均值，游標移動、輸入文字等局部變動不會被其餘未變動的區域平均掉。
+    """
+    return float(ImageChops.difference(a, b).getextrema()[1])
+
+
+class AnimationWriter:
+    """動畫輸出器"""
+
+    def __init__(
+        self,
+        output_path: str,
+        output_format: str = "gif",
+        loop: int | None = 0,
+        lossless: bool = False,
+        quality: int = 80,
+        colors: int = 256,
+        dither: bool = True,
+        workers: int | None = None,
+        dedupe_threshold: float | None = None,
+    ):
+        """
+        Args:
+            output_path: 輸出檔案路徑
+            output_format: 輸出格式（gif, webp, apng）
+            loop: 循環次數（0 = 無限循環，None = 只播放一次）
+            lossless: WebP 是否使用無損壓縮
+            quality: WebP 品質（0-100）
+            colors: GIF 調色盤顏色數
+            dither: GIF 是否抖色
+            workers: 幀準備執行緒數（None = 依資源管理器分配）
+            dedupe_threshold: 與前一個保留幀的差異低於此值時合併為同一幀並延長顯示時間
+                （None = 不合併，0 = 僅合併完全相同的幀）
+        """
+        output_format = output_format.lower()
+        if output_format not in ANIMATION_EXTENSIONS:
+            raise ValueError(f"不支援的動畫格式: {output_format}")
+
+        self.output_path = output_path
+        self.output_format = output_format
+        self.loop = loop
+        self.lossless = lossless
+        self.quality = quality
+        self.colors = colors
+        self.dither = dither
+        self.dedupe_threshold = dedupe_threshold
+        self.merged_frames = 0  # 因重複而合併的幀數
+
+        self._workers = workers or default_workers()
+        self._executor = ThreadPoolExecutor(max_workers=self._workers)
+        self._pending: deque[tuple[Future[tuple[Image.Image, Image.Image | None]], int]] = deque()
+        # 保留的幀超過此任務分得的記憶體預算的一半後，改為逐幀寫入輸出檔
+        # （Pillow 的 GIF / PNG 多幀存檔會再複製每一幀，存檔時的用量約為保留量的兩倍）
+        self._memory_limit = GOVERNOR.memory_share() // 2
+        self._frames: list[Image.Image] = []
+        self._frame_bytes = 0
+        self._durations: list[int] = []
+        self._stream: StreamWriter | None = None
+        self._last_signature: Image.Image | None = None
+
+    def __enter__(self) -> AnimationWriter:
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._abort()
+
+    @property
+    def streaming(self) -> bool:
+        """是否已因超過記憶體預算而改為逐幀寫入"""
+        return self._stream is not None
+
+    @property
+    def frame_count(self) -> int:
+        """已接收且未被合併的幀數"""
+        written = self._stream.frame_count + 1 if self._stream is not None else 0
+        return written + len(self._frames) + len(self._pending)
+
+    def append(self, frame: Image.Image | Callable[[], Image.Image], duration: int):
+        """
+        新增一幀
+
+        Args:
+            frame: 圖片，或在背景執行緒中產生圖片的函數（例如讀檔、色彩轉換）
+            duration: 此幀的顯示時間（毫秒）
+        """
+        self._pending.append((self._executor.submit(self._prepare, frame), duration))
+        # 限制同時處理中的幀數，避免記憶體隨輸入無限增長
+        while len(self._pending) > self._workers * 2:
+            self._collect()
+
+    def close(self) -> str:
+        """
+        等待所有幀準備完成並寫入檔案
+
+        Returns:
+            輸出檔案路徑
+        """
+        try:
+            while self._pending:
+                self._collect()
+        except BaseException:
+            self._abort()
+            raise
+        self._executor.shutdown(wait=True)
+
+        if self._stream is not None:
+            return self._stream.close()
+        if not self._frames:
+            raise ValueError("沒有任何幀可輸出")
+
+        first, rest = self._frames[0], self._frames[1:]
+        options: dict = {
+            "format": _PILLOW_FORMATS[self.output_format],
+            "save_all": True,
+            "append_images": rest,
+            "duration": self._durations,
+        }
+        if self.loop is not None:
+            options["loop"] = self.loop
+        elif self.output_format != "gif":
+            # GIF 省略循環設定即只播放一次；APNG 與 WebP 以播放 1 次表示
+            options["loop"] = 1
+        if self.output_format == "gif":
+            options["optimize"] = True
+        elif self.output_format == "webp":
+            options["lossless"] = self.lossless
+            options["quality"] = self.quality
+        try:
+            first.save(self.output_path, **options)
+        except BaseException:
+            remove_partial(self.output_path)
+            raise
+        finally:
+            self._frames.clear()
+            self._durations.clear()
+        return self.output_path
+
+    def _abort(self):
+        """放棄輸出：停止準備中的幀，並刪除未完成的輸出檔"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._pending.clear()
+        self._frames.clear()
+        if self._stream is not None:
+            self._stream.abort()
+
+    def _collect(self):
+        """取出最早送出的幀（維持順序），與前一個保留幀幾乎相同時合併"""
+        future, duration = self._pending.popleft()
+        img, signature = future.result()
+        if (
+            signature is not None
+            and self._last_signature is not None
+            and signature_distance(signature, self._last_signature) <= self.dedupe_threshold
+        ):
+            if self._stream is not None:
+                self._stream.extend(duration)
+            else:
+                self._durations[-1] += duration
+            self.merged_frames += 1
+            return
+
+        self._last_signature = signature
+        if self._stream is not None:
+            self._stream.write(img, duration)
+            return
+        self._frames.append(img)
+        self._durations.append(duration)
+        self._frame_bytes += img.width * img.height * len(img.getbands())
+        if self._frame_bytes > self._memory_limit:
+            self._start_streaming()
+
+    def _start_streaming(self):
+        """改為逐幀寫入輸出檔，並寫入目前保留的幀"""
+        self._stream = open_stream_writer(
+            self.output_path, self.output_format, self.loop, self.lossless, self.quality
+        )
+        for img, duration in zip(self._frames, self._durations):
+            self._stream.write(img, duration)
+        self._frames.clear()
+        self._durations.clear()
+        self._frame_bytes = 0
+
+    def _prepare(
+        self, frame: Image.Image | Callable[[], Image.Image]
+    ) -> tuple[Image.Image, Image.Image | None]:
+        """載入並轉換單幀，同時計算重複幀比對用的縮圖（於背景執行緒執行）"""
+        img = frame() if callable(frame) else frame
+        signature = frame_signature(img) if self.dedupe_threshold is not None else None
+        return self._convert(img), signature
+
+    def _convert(self, img: Image.Image) -> Image.Image:
+        """依輸出格式轉換單幀"""
+        if self.output_format == "gif":
+            # 有透明度或需減少顏色的調色盤幀先轉為全彩，再依設定量化
+            if img.mode in ("LA", "PA") or (img.mode == "P" and self.colors < 256):
+                has_alpha = img.mode != "P" or "transparency" in img.info
+                img = img.convert("RGBA" if has_alpha else "RGB")
+            if img.mode in ("RGB", "RGBA"):
+                return quantize_frame(img, self.colors, self.dither)
+            return img
+        # WebP 與 APNG 使用全彩，保留透明度
+        if img.mode in ("RGB", "RGBA"):
+            return img
+        if (img.mode == "P" and "transparency" in img.info) or img.mode in ("LA", "PA"):
+            return img.convert("RGBA")
+        return img.convert("RGB")
@@ -5,12 +5,19 @@
 from __future__ import annotations
 
 import os
+from functools import partial
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Iterator
 
 import cv2
 import imageio
-from PIL import Image
+from PIL import Image, ImageSequence
+
+from .animation import AnimationWriter
+from .encoder_profiles import EncoderProfile, container_of, validate_codec
+from .probe import estimate_total_frames
+from .resources import GOVERNOR
+from .transform import FrameTransform
 
 
 class VideoConverter:
@@ -23,6 +30,7 @@ class VideoConverter:
         frame_interval: int = 1,
         output_format: str = "png",
         progress_callback: Callable[[int, int], None] | None = None,
+        transform: FrameTransform | None = None,
     ) -> list[str]:
         """
         將影片轉換為圖片序列
@@ -33,17 +41,18 @@ class VideoConverter:
             frame_interval: 每幾幀輸出一張圖片（1 = 每幀都輸出）
             output_format: 輸出圖片格式（png, jpg, bmp, webp）
             progress_callback: 進度回調函數 (current_frame, total_frames)
+            transform: 裁切、旋轉與翻轉設定（None = 不轉換）
 
         Returns:
             輸出的圖片路徑列表
         """
         os.makedirs(output_dir, exist_ok=True)
 
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise ValueError(f"無法開啟影片: {video_path}")
+        cap = VideoConverter.open_video(video_path)
 
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        total_frames = estimate_total_frames(
+            video_path, fallback=int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        )
         output_files: list[str] = []
         frame_count = 0
         saved_count = 0
@@ -56,6 +65,8 @@ class VideoConverter:
                 break
 
             if frame_count % frame_interval == 0:
+                if transform is not None:
+                    frame = transform.apply(frame)
                 output_path = os.path.join(
                     output_dir, f"{video_name}_{saved_count:06d}.{output_format}"
                 )
@@ -71,9 +82,12 @@ class VideoConverter:
 
             frame_count += 1
             if progress_callback:
-                progress_callback(frame_count, total_frames)
+                # 幀數為估計值時避免進度超過 100%
+                progress_callback(frame_count, max(total_frames, frame_count))
 
         cap.release()
+        if progress_callback and frame_count:
+            progress_callback(frame_count, frame_count)
         return output_files
 
     @staticmethod
@@ -83,6 +97,7 @@ class VideoConverter:
         fps: float = 10.0,
         loop: int = 0,
         progress_callback: Callable[[int, int], None] | None = None,
+        dedupe_threshold: float | None = None,
     ) -> str:
         """
         將圖片序列轉換為 GIF
@@ -93,37 +108,107 @@ class VideoConverter:
             fps: 每秒幀數
             loop: 循環次數（0 = 無限循環）
             progress_callback: 進度回調函數
+            dedupe_threshold: 合併相鄰重複幀的差異門檻（None = 不合併）
 
         Returns:
             輸出的 GIF 路徑
         """
+        return VideoConverter.images_to_animation(
+            image_paths,
+            output_path,
+            fps,
+            loop,
+            progress_callback,
+            output_format="gif",
+            dedupe_threshold=dedupe_threshold,
+        )
+
+    @staticmethod
+    def images_to_animation(
+        image_paths: list[str],
+        output_path: str,
+        fps: float = 10.0,
+        loop: int = 0,
+        progress_callback: Callable[[int, int], None] | None = None,
+        output_format: str = "gif",
+        lossless: bool = False,
+        quality: int = 80,
+        dedupe_threshold: float | None = None,
+    ) -> str:
+        """
+        將圖片序列轉換為動畫（GIF、動態 WebP 或 APNG）
+
+        圖片在背景執行緒中平行讀取與轉換，主執行緒依序交給編碼器。
+        多幀的輸入（動態 GIF/WebP/APNG）會逐幀讀取並保留各幀原有的顯示時間。
+
+        Args:
+            image_paths: 圖片路徑列表
+            output_path: 輸出檔案路徑
+            fps: 每秒幀數
+            loop: 循環次數（0 = 無限循環）
+            progress_callback: 進度回調函數
+            output_format: 輸出格式（gif, webp, apng）
+            lossless: WebP 是否使用無損壓縮
+            quality: WebP 品質（0-100）
+            dedupe_threshold: 合併相鄰重複幀的差異門檻（None = 不合併）
+
+        Returns:
+            輸出的檔案路徑
+        """
         if not image_paths:
             raise ValueError("圖片列表不能為空")
 
-        images = []
         total = len(image_paths)
-
-        for i, img_path in enumerate(image_paths):
-            img = Image.open(img_path)
-            # 確保轉換為 RGB 或 RGBA
-            if img.mode not in ("RGB", "RGBA", "P"):
-                img = img.convert("RGB")
-            images.append(img)
-            if progress_callback:
-                progress_callback(i + 1, total)
-
         duration = int(1000 / fps)  # 毫秒
-        images[0].save(
+
+        with AnimationWriter(
             output_path,
-            save_all=True,
-            append_images=images[1:],
-            duration=duration,
+            output_format,
             loop=loop,
-            optimize=True,
-        )
+            lossless=lossless,
+            quality=quality,
+            dedupe_threshold=dedupe_threshold,
+        ) as writer:
+            for i, img_path in enumerate(image_paths):
+                with Image.open(img_path) as img:
+                    animated = getattr(img, "is_animated", False)
+                    if animated:
+                        for frame, frame_duration in VideoConverter._iter_frames(img, duration):
+                            writer.append(frame, frame_duration)
+                if not animated:
+                    writer.append(partial(VideoConverter._load_image, img_path), duration)
+                if progress_callback:
+                    progress_callback(i + 1, total)
 
         return output_path
 
+    @staticmethod
+    def _load_image(img_path: str) -> Image.Image:
+        """讀取圖片並確保為 RGB、RGBA 或調色盤模式"""
+        img = Image.open(img_path)
+        img.load()
+        if img.mode not in ("RGB", "RGBA", "P"):
+            img = img.convert("RGB")
+        return img
+
+    @staticmethod
+    def _iter_frames(img: Image.Image, default_duration: int) -> Iterator[tuple[Image.Image, int]]:
+        """
+        逐幀讀取多幀圖片（依序 seek，不一次載入所有幀）
+
+        Args:
+            img: 已開啟的多幀圖片
+            default_duration: 幀沒有記錄顯示時間時使用的預設值（毫秒）
+
+        Yields:
+            (獨立的 RGB/RGBA 幀, 顯示時間)
+        """
+        for frame in ImageSequence.Iterator(img):
+            frame_duration = int(frame.info.get("duration") or default_duration)
+            # seek 會重複使用同一個物件，轉換後得到獨立的副本
+            has_alpha = frame.mode in ("RGBA", "LA", "PA") or "transparency" in frame.info
+            yield frame.convert("RGBA" if has_alpha else "RGB"), frame_duration
+
     @staticmethod
     def images_to_video(
         image_paths: list[str],
@@ -131,6 +216,7 @@ class VideoConverter:
         fps: float = 30.0,
         codec: str = "libx264",
         progress_callback: Callable[[int, int], None] | None = None,
+        profile: EncoderProfile | None = None,
     ) -> str:
         """
         將圖片序列轉換為影片
@@ -139,8 +225,9 @@ class VideoConverter:
             image_paths: 圖片路徑列表
             output_path: 輸出影片路徑
             fps: 每秒幀數
-            codec: 編碼器
+            codec: 編碼器（指定 profile 時忽略）
             progress_callback: 進度回調函數
+            profile: 編碼設定檔（編碼器、preset、CRF、像素格式、GOP）
 
         Returns:
             輸出的影片路徑
@@ -149,9 +236,21 @@ class VideoConverter:
             raise ValueError("圖片列表不能為空")
 
         total = len(image_paths)
+        container = container_of(output_path)
+
+        if profile is not None:
+            validate_codec(container, profile.codec)
+            writer_kwargs = profile.writer_kwargs(GOVERNOR.threads())
+        else:
+            validate_codec(container, codec)
+            writer_kwargs = {
+                "codec": codec,
+                "quality": 8,
+                "ffmpeg_params": GOVERNOR.ffmpeg_params(),
+            }
 
         # 使用 imageio-ffmpeg 來寫入影片
-        writer = imageio.get_writer(output_path, fps=fps, codec=codec, quality=8)
+        writer = imageio.get_writer(output_path, fps=fps, **writer_kwargs)
 
         for i, img_path in enumerate(image_paths):
             img = imageio.imread(img_path)
@@ -170,6 +269,11 @@ class VideoConverter:
         fps: float = 10.0,
         max_width: int | None = None,
         progress_callback: Callable[[int, int], None] | None = None,
+        colors: int = 256,
+        dither: bool = True,
+        dedupe_threshold: float | None = None,
+        use_timestamps: bool = False,
+        transform: FrameTransform | None = None,
     ) -> str:
         """
         將影片直接轉換為 GIF
@@ -181,53 +285,253 @@ class VideoConverter:
             fps: GIF 播放速度
             max_width: 最大寬度（用於縮小 GIF 尺寸）
             progress_callback: 進度回調函數
+            colors: 調色盤顏色數（2-256）
+            dither: 是否使用 Floyd-Steinberg 抖色
+            dedupe_threshold: 合併相鄰重複幀的差異門檻（None = 不合併）
+            use_timestamps: 依來源影格時間戳決定每幀顯示時間
+            transform: 裁切、旋轉與翻轉設定（None = 不轉換）
 
         Returns:
             輸出的 GIF 路徑
         """
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise ValueError(f"無法開啟影片: {video_path}")
+        return VideoConverter.video_to_animation(
+            video_path,
+            output_path,
+            frame_interval,
+            fps,
+            max_width,
+            progress_callback,
+            output_format="gif",
+            colors=colors,
+            dither=dither,
+            dedupe_threshold=dedupe_threshold,
+            use_timestamps=use_timestamps,
+            transform=transform,
+        )
+
+    @staticmethod
+    def video_to_animation(
+        video_path: str,
+        output_path: str,
+        frame_interval: int = 1,
+        fps: float = 10.0,
+        max_width: int | None = None,
+        progress_callback: Callable[[int, int], None] | None = None,
+        output_format: str = "gif",
+        colors: int = 256,
+        dither: bool = True,
+        lossless: bool = False,
+        quality: int = 80,
+        dedupe_threshold: float | None = None,
+        use_timestamps: bool = False,
+        transform: FrameTransform | None = None,
+    ) -> str:
+        """
+        將影片直接轉換為動畫（GIF、動態 WebP 或 APNG）
+
+        影格依序解碼，裁切、色彩轉換、縮放與量化則在背景執行緒中平行處理。
+
+        Args:
+            video_path: 影片檔案路徑
+            output_path: 輸出檔案路徑
+            frame_interval: 每幾幀取一幀（1 = 每幀都取）
+            fps: 動畫播放速度
+            max_width: 最大寬度（用於縮小輸出尺寸）
+            progress_callback: 進度回調函數
+            output_format: 輸出格式（gif, webp, apng）
+            colors: GIF 調色盤顏色數（2-256）
+            dither: GIF 是否使用 Floyd-Steinberg 抖色
+            lossless: WebP 是否使用無損壓縮
+            quality: WebP 品質（0-100）
+            dedupe_threshold: 合併相鄰重複幀的差異門檻（None = 不合併）
+            use_timestamps: 依來源影格時間戳決定每幀顯示時間（保留可變幀率影片的實際節奏，
+                忽略 fps）
+            transform: 裁切、旋轉與翻轉設定（None = 不轉換），在所有處理之前套用
+
+        Returns:
+            輸出的檔案路徑
+        """
+        cap = VideoConverter.open_video(video_path)
 
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        frames: list[Image.Image] = []
+        total_frames = estimate_total_frames(
+            video_path, fallback=int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        )
+        duration = int(1000 / fps)
+        source_fps = cap.get(cv2.CAP_PROP_FPS)
         frame_count = 0
+        # 裁切、色彩轉換與縮放於背景執行緒中執行
+        to_image = partial(VideoConverter.frame_to_image, max_width=max_width, transform=transform)
+        # 使用時間戳時，需等到下一個取樣幀才知道目前幀的顯示時間
+        held: tuple[object, float] | None = None
 
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
+        writer = AnimationWriter(
+            output_path,
+            output_format,
+            lossless=lossless,
+            quality=quality,
+            colors=colors,
+            dither=dither,
+            dedupe_threshold=dedupe_threshold,
+        )
+        with writer:
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+
+                if frame_count % frame_interval == 0:
+                    if use_timestamps:
+                        timestamp = cap.get(cv2.CAP_PROP_POS_MSEC)
+                        if held is not None:
+                            writer.append(
+                                partial(to_image, held[0]), max(round(timestamp - held[1]), 10)
+                            )
+                        held = (frame, timestamp)
+                    else:
+                        writer.append(partial(to_image, frame), duration)
+
+                frame_count += 1
+                if progress_callback:
+                    # 幀數為估計值時避免進度超過 100%
+                    progress_callback(frame_count, max(total_frames, frame_count))
+
+            cap.release()
+            if progress_callback and frame_count:
+                progress_callback(frame_count, frame_count)
+
+            if held is not None:
+                # 最後一幀沒有下一個時間戳，以來源幀率推算
+                last_duration = (
+                    round(1000 * frame_interval / source_fps) if source_fps > 0 else duration
+                )
+                writer.append(partial(to_image, held[0]), last_duration)
 
-            if frame_count % frame_interval == 0:
-                # BGR 轉 RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                img = Image.fromarray(frame_rgb)
+            if not writer.frame_count:
+                raise ValueError("無法從影片中提取任何幀")
+
+        return output_path
 
-                # 如果指定了最大寬度，進行縮放
-                if max_width and img.width > max_width:
-                    ratio = max_width / img.width
-                    new_height = int(img.height * ratio)
-                    img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
+    @staticmethod
+    def gif_to_gif(
+        input_path: str,
+        output_path: str,
+        max_width: int | None = None,
+        frame_step: int = 1,
+        colors: int = 256,
+        dither: bool = True,
+        dedupe_threshold: float | None = None,
+        progress_callback: Callable[[int, int], None] | None = None,
+    ) -> str:
+        """
+        重新最佳化既有的 GIF（或其他動畫）：縮小尺寸、減少幀數並重新量化
 
-                frames.append(img)
+        輸入逐幀讀取，被捨棄幀的顯示時間會併入前一個保留幀，維持原本的播放長度。
+        輸出保留的幀超過記憶體預算時改為逐幀寫入，因此輸入與輸出的記憶體用量皆有上限。
+        有透明色的幀同樣依 colors 與 dither 量化，並保留一個透明色索引。
 
-            frame_count += 1
-            if progress_callback:
-                progress_callback(frame_count, total_frames)
+        Args:
+            input_path: 輸入動畫路徑
+            output_path: 輸出 GIF 路徑
+            max_width: 最大寬度（None = 不縮放）
+            frame_step: 每幾幀保留一幀（1 = 全部保留）
+            colors: 調色盤顏色數（2-256）
+            dither: 是否使用 Floyd-Steinberg 抖色
+            dedupe_threshold: 合併相鄰重複幀的差異門檻（None = 不合併）
+            progress_callback: 進度回調函數
 
-        cap.release()
+        Returns:
+            輸出的 GIF 路徑
+        """
+        try:
+            img = Image.open(input_path)
+        except OSError as e:
+            raise ValueError(f"無法開啟動畫: {input_path}") from e
 
-        if not frames:
-            raise ValueError("無法從影片中提取任何幀")
+        frame_step = max(frame_step, 1)
+        total_frames = getattr(img, "n_frames", 1)
+        held: tuple[Image.Image, int] | None = None
 
-        duration = int(1000 / fps)
-        frames[0].save(
+        writer = AnimationWriter(
             output_path,
-            save_all=True,
-            append_images=frames[1:],
-            duration=duration,
-            loop=0,
-            optimize=True,
+            "gif",
+            loop=img.info.get("loop"),
+            colors=colors,
+            dither=dither,
+            dedupe_threshold=dedupe_threshold,
         )
+        with img, writer:
+            for index, (frame, frame_duration) in enumerate(VideoConverter._iter_frames(img, 100)):
+                if index % frame_step == 0:
+                    if held is not None:
+                        writer.append(
+                            partial(VideoConverter.fit_width, held[0], max_width), held[1]
+                        )
+                    held = (frame, frame_duration)
+                elif held is not None:
+                    held = (held[0], held[1] + frame_duration)
+
+                if progress_callback:
+                    progress_callback(index + 1, max(total_frames, index + 1))
+
+            if held is None:
+                raise ValueError("無法從動畫中讀取任何幀")
+            writer.append(partial(VideoConverter.fit_width, held[0], max_width), held[1])
 
         return output_path
+
+    @staticmethod
+    def open_video(video_path: str) -> cv2.VideoCapture:
+        """
+        開啟影片，解碼執行緒數依資源管理器分配
+
+        Args:
+            video_path: 影片檔案路徑
+
+        Returns:
+            已開啟的 VideoCapture
+        """
+        cap = cv2.VideoCapture(
+            video_path, cv2.CAP_ANY, [cv2.CAP_PROP_N_THREADS, GOVERNOR.threads()]
+        )
+        if not cap.isOpened():
+            raise ValueError(f"無法開啟影片: {video_path}")
+        return cap
+
+    @staticmethod
+    def frame_to_image(
+        frame, max_width: int | None = None, transform: FrameTransform | None = None
+    ) -> Image.Image:
+        """
+        將 OpenCV 的 BGR 影格轉為 RGB 圖片，並依最大寬度等比例縮小
+
+        Args:
+            frame: OpenCV 讀取的 BGR 影格
+            max_width: 最大寬度（None = 不縮放）
+            transform: 裁切、旋轉與翻轉設定，於色彩轉換前套用
+
+        Returns:
+            RGB 圖片
+        """
+        if transform is not None:
+            frame = transform.apply(frame)
+        # BGR 轉 RGB
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return VideoConverter.fit_width(Image.fromarray(frame_rgb), max_width)
+
+    @staticmethod
+    def fit_width(img: Image.Image, max_width: int | None = None) -> Image.Image:
+        """
+        依最大寬度等比例縮小圖片
+
+        Args:
+            img: 圖片
+            max_width: 最大寬度（None = 不縮放）
+
+        Returns:
+            縮放後的圖片（未超過最大寬度時回傳原圖）
+        """
+        if max_width and img.width > max_width:
+            ratio = max_width / img.width
+            new_height = max(int(img.height * ratio), 1)
+            img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
+        return img
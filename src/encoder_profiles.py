@@ -0,0 +1,155 @@
+"""
+影片編碼設定檔模組
+
+依輸出容器提供 fast / balanced / archive 三種編碼設定，在編碼速度與檔案大小之間取捨
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# 各容器可使用的編碼器
+CONTAINER_CODECS = {
+    "mp4": ("libx264", "libx265", "mpeg4"),
+    "mov": ("libx264", "libx265", "mpeg4", "prores_ks", "mjpeg"),
+    "avi": ("mpeg4", "libx264", "mjpeg"),
+    "webm": ("libvpx-vp9", "libvpx"),
+    "mkv": ("libx264", "libx265", "libvpx-vp9", "libvpx", "mpeg4"),
+}
+
+
+@dataclass(frozen=True)
+class EncoderProfile:
+    """影片編碼設定"""
+
+    name: str  # fast, balanced, archive
+    label: str  # 顯示名稱
+    codec: str
+    preset: str | None = None  # x264/x265 的 -preset
+    crf: int | None = None  # 固定品質係數（數值越小品質越好）
+    pixel_format: str = "yuv420p"
+    gop: int | None = None  # 關鍵幀間隔（-g）
+    extra_params: tuple[str, ...] = field(default=())  # 其他 ffmpeg 參數
+
+    def ffmpeg_params(self) -> list[str]:
+        """產生 ffmpeg 編碼參數（不含編碼器與像素格式）"""
+        params: list[str] = []
+        if self.preset:
+            params += ["-preset", self.preset]
+        if self.crf is not None:
+            params += ["-crf", str(self.crf)]
+        if self.gop is not None:
+            params += ["-g", str(self.gop)]
+        params += list(self.extra_params)
+        return params
+
+    def writer_kwargs(self, threads: int | None = None) -> dict:
+        """
+        產生 imageio.get_writer 的參數
+
+        Args:
+            threads: ffmpeg 編碼執行緒數（None = 由 ffmpeg 決定）
+
+        Returns:
+            imageio.get_writer 的關鍵字參數
+        """
+        params = self.ffmpeg_params()
+        if threads:
+            params += ["-threads", str(threads)]
+        return {
+            "codec": self.codec,
+            # 品質完全由設定檔的參數控制，避免 imageio 另外加上 -qscale
+            "quality": None,
+            "pixelformat": self.pixel_format,
+            "ffmpeg_params": params,
+        }
+
+
+def _x264_profiles() -> dict[str, EncoderProfile]:
+    return {
+        "fast": EncoderProfile("fast", "快速", "libx264", preset="veryfast", crf=23, gop=250),
+        "balanced": EncoderProfile("balanced", "平衡", "libx264", preset="medium", crf=20, gop=250),
+        "archive": EncoderProfile("archive", "封存", "libx264", preset="veryslow", crf=17, gop=250),
+    }
+
+
+# 各容器的編碼設定檔
+PROFILES: dict[str, dict[str, EncoderProfile]] = {
+    "mp4": _x264_profiles(),
+    "mov": _x264_profiles(),
+    "avi": {
+        "fast": EncoderProfile("fast", "快速", "mpeg4", extra_params=("-q:v", "5")),
+        "balanced": EncoderProfile("balanced", "平衡", "libx264", preset="medium", crf=20),
+        "archive": EncoderProfile("archive", "封存", "libx264", preset="veryslow", crf=17),
+    },
+    "webm": {
+        "fast": EncoderProfile(
+            "fast",
+            "快速",
+            "libvpx-vp9",
+            crf=36,
+            gop=240,
+            extra_params=("-b:v", "0", "-deadline", "realtime", "-cpu-used", "8", "-row-mt", "1"),
+        ),
+        "balanced": EncoderProfile(
+            "balanced",
+            "平衡",
+            "libvpx-vp9",
+            crf=32,
+            gop=240,
+            extra_params=("-b:v", "0", "-deadline", "good", "-cpu-used", "4", "-row-mt", "1"),
+        ),
+        "archive": EncoderProfile(
+            "archive",
+            "封存",
+            "libvpx-vp9",
+            crf=28,
+            gop=240,
+            extra_params=("-b:v", "0", "-deadline", "good", "-cpu-used", "1", "-row-mt", "1"),
+        ),
+    },
+}
+# 預設使用的設定檔
+DEFAULT_PROFILE = "balanced"
+
+
+def container_of(output_path: str) -> str:
+    """由輸出路徑取得容器名稱（副檔名）"""
+    return Path(output_path).suffix.lstrip(".").lower()
+
+
+def get_profile(container: str, name: str = DEFAULT_PROFILE) -> EncoderProfile:
+    """
+    取得指定容器的編碼設定檔
+
+    Args:
+        container: 容器名稱（mp4, avi, mov, webm）
+        name: 設定檔名稱（fast, balanced, archive）
+
+    Returns:
+        編碼設定
+    """
+    profiles = PROFILES.get(container.lower())
+    if profiles is None:
+        raise ValueError(f"沒有適用於 {container} 的編碼設定檔")
+    if name not in profiles:
+        raise ValueError(f"未知的編碼設定檔: {name}（可用：{', '.join(profiles)}）")
+    return profiles[name]
+
+
+def validate_codec(container: str, codec: str):
+    """
+    確認編碼器可用於指定的容器，不相容時拋出 ValueError
+
+    未列出的容器不做檢查，交由 ffmpeg 處理。
+
+    Args:
+        container: 容器名稱
+        codec: 編碼器名稱
+    """
+    allowed = CONTAINER_CODECS.get(container.lower())
+    if allowed is not None and codec not in allowed:
+        raise ValueError(
+            f"編碼器 {codec} 不適用於 {container.upper()} 容器（可用：{', '.join(allowed)}）"
+        )
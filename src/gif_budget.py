@@ -0,0 +1,402 @@
+"""
+目標大小 GIF 模組
+
+以少量取樣幀估算不同設定下的 GIF 大小，利用大小隨寬度與畫質單調遞減的特性以二分搜尋
+找出符合目標大小的最佳設定，再執行完整編碼
+"""
+
+from __future__ import annotations
+
+import io
+import math
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import cv2
+from PIL import Image
+
+from .animation import quantize_frame
+from .converter import VideoConverter
+from .probe import probe_media
+from .transform import FrameTransform
+
+# 寬度縮放比例（由高畫質到低畫質）
+WIDTH_SCALES = (1.0, 0.85, 0.7, 0.55, 0.4, 0.3, 0.2)
+# 每個寬度下依序嘗試的 (幀步進, 顏色數, 抖色)
+QUALITY_LADDER = (
+    (1, 256, True),
+    (1, 128, True),
+    (2, 256, True),
+    (2, 128, True),
+    (2, 64, False),
+    (3, 64, False),
+)
+# 最小輸出寬度
+MIN_WIDTH = 120
+# 估算時的安全係數
+SAFETY_MARGIN = 1.05
+# 取樣的來源幀數上限（占影片總幀數的比例）
+SAMPLE_FRACTION = 0.1
+# 完整編碼超出目標時最多重試次數
+MAX_FULL_ENCODES = 3
+
+
+@dataclass(frozen=True)
+class GifCandidate:
+    """一組 GIF 編碼設定"""
+
+    width: int
+    frame_step: int  # 在使用者幀間隔上再乘的步進
+    colors: int
+    dither: bool
+
+    def describe(self, frame_interval: int, fps: float) -> str:
+        """產生顯示用的設定描述"""
+        return (
+            f"寬度 {self.width}、每 {frame_interval * self.frame_step} 幀取一幀、"
+            f"{fps / self.frame_step:.1f} FPS、{self.colors} 色、"
+            f"抖色{'開' if self.dither else '關'}"
+        )
+
+
+@dataclass
+class GifSizeReport:
+    """目標大小模式的執行結果"""
+
+    output_path: str
+    target_bytes: int
+    output_bytes: int
+    candidate: GifCandidate
+    frame_interval: int
+    fps: float
+    evaluated: int  # 取樣評估的設定數
+    full_encodes: int  # 實際執行的完整編碼次數
+    sample_seconds: float  # 讀取取樣幀與取樣評估的耗時
+    encode_seconds: float  # 完整編碼的總耗時
+    exhausted: bool  # 超出目標時是否已無更小的設定（否則為達到完整編碼次數上限）
+
+    @property
+    def equivalent_encodes(self) -> float:
+        """實際耗時折合的完整編碼次數（取樣耗時以平均完整編碼耗時換算）"""
+        if not self.full_encodes or self.encode_seconds <= 0:
+            return float(self.full_encodes)
+        per_encode = self.encode_seconds / self.full_encodes
+        return self.full_encodes + self.sample_seconds / per_encode
+
+    @property
+    def saved_encodes(self) -> float:
+        """
+        相較於以完整編碼嘗試同樣的設定所省下的次數（依實際耗時計算，可能為負值）
+
+        以完整編碼手動嘗試時，每評估一組設定就需一次完整編碼。
+        """
+        return self.evaluated - self.equivalent_encodes
+
+    def __str__(self) -> str:
+        saved = self.saved_encodes
+        if saved > 0:
+            saving = f"比逐一完整編碼嘗試省下約 {saved:.1f} 次完整編碼的時間"
+        else:
+            saving = "取樣評估未能省下時間"
+        lines = [
+            self.output_path,
+            f"大小：{self.output_bytes / 1024:.1f} KB / 目標 {self.target_bytes / 1024:.1f} KB",
+            f"設定：{self.candidate.describe(self.frame_interval, self.fps)}",
+            f"取樣評估 {self.evaluated} 組設定 {self.sample_seconds:.1f} 秒，"
+            f"完整編碼 {self.full_encodes} 次 {self.encode_seconds:.1f} 秒（{saving}）",
+        ]
+        if self.output_bytes > self.target_bytes:
+            if self.exhausted:
+                lines.append("警告：已使用最小設定，仍超過目標大小")
+            else:
+                lines.append(f"警告：已達完整編碼次數上限（{MAX_FULL_ENCODES} 次），仍超過目標大小")
+        return "\n".join(lines)
+
+
+def read_sample_segments(
+    video_path: str,
+    frame_interval: int = 1,
+    max_width: int | None = None,
+    segments: int = 3,
+    frames_per_segment: int = 24,
+    transform: FrameTransform | None = None,
+    max_fraction: float = SAMPLE_FRACTION,
+) -> tuple[list[list[Image.Image]], int]:
+    """
+    從影片中均勻取出數段連續幀（段內幀已套用幀間隔）
+
+    段落起點與最近的關鍵幀相距不超過一段的長度時對齊到該關鍵幀，避免跳轉時需解碼大量影格。
+    影片未提供幀數時以長度 × FPS 推算，兩者皆無法取得時拋出 ValueError。
+    取樣的來源幀總數不超過影片的 max_fraction，但每段至少保留足以套用最大幀步進的幀數。
+
+    Args:
+        video_path: 影片檔案路徑
+        frame_interval: 每幾幀取一幀
+        max_width: 最大寬度
+        segments: 取樣段數
+        frames_per_segment: 每段最多取出的輸出幀數
+        transform: 裁切、旋轉與翻轉設定
+        max_fraction: 取樣的來源幀數上限（占影片總幀數的比例）
+
+    Returns:
+        (取樣段落列表, 影片總幀數)
+    """
+    info = probe_media(video_path)
+    total_frames = info.frame_count or round(info.duration * info.fps)
+    if total_frames <= 0:
+        raise ValueError(f"無法取得影片總幀數，無法估算輸出大小: {video_path}")
+    max_step = max(step for step, _, _ in QUALITY_LADDER)
+    limit = int(total_frames * max_fraction / (segments * frame_interval))
+    frames_per_segment = max(min(frames_per_segment, limit), 2 * max_step)
+    span = frames_per_segment * frame_interval
+
+    starts: list[int] = []
+    for i in range(segments):
+        start = int(total_frames * (i + 1) / (segments + 1)) - span // 2
+        if info.keyframes and info.fps > 0:
+            # 關鍵幀稀疏時不對齊，避免各段都落在同一個關鍵幀
+            nearest = round(min(info.keyframes, key=lambda t: abs(t * info.fps - start)) * info.fps)
+            if abs(nearest - start) <= span and nearest not in starts:
+                start = nearest
+        start = min(max(start, 0), max(total_frames - span, 0))
+        if start not in starts:
+            starts.append(start)
+
+    cap = VideoConverter.open_video(video_path)
+
+    samples: list[list[Image.Image]] = []
+    try:
+        for start in sorted(starts):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+            segment: list[Image.Image] = []
+            for offset in range(span):
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if offset % frame_interval == 0:
+                    segment.append(VideoConverter.frame_to_image(frame, max_width, transform))
+            if segment:
+                samples.append(segment)
+    finally:
+        cap.release()
+
+    if not samples:
+        raise ValueError("無法從影片中提取任何幀")
+    return samples, total_frames
+
+
+def estimate_gif_size(
+    samples: list[list[Image.Image]],
+    candidate: GifCandidate,
+    output_frames: int,
+    fps: float,
+) -> int:
+    """
+    以取樣幀編碼 GIF，外推完整輸出的位元組數
+
+    GIF 的第一幀為完整畫面，之後的幀只記錄變動區域，因此分別估算第一幀與之後每幀的大小，
+    避免短取樣段高估每幀大小。
+
+    Args:
+        samples: 取樣段落（read_sample_segments 的結果）
+        candidate: 要評估的設定
+        output_frames: 此設定下完整輸出的幀數
+        fps: 此設定下的 GIF FPS
+
+    Returns:
+        估計的檔案大小（位元組）
+    """
+    first_sizes = []
+    delta_sizes = []
+    for segment in samples:
+        frames = []
+        for img in segment[:: candidate.frame_step]:
+            img = VideoConverter.fit_width(img, candidate.width)
+            frames.append(quantize_frame(img, candidate.colors, candidate.dither))
+        if not frames:
+            continue
+
+        first_size = _encoded_size(frames[:1], fps)
+        first_sizes.append(first_size)
+        if len(frames) > 1:
+            delta_sizes.append((_encoded_size(frames, fps) - first_size) / (len(frames) - 1))
+
+    if not first_sizes:
+        return 0
+    first = sum(first_sizes) / len(first_sizes)
+    delta = sum(delta_sizes) / len(delta_sizes) if delta_sizes else first
+    return int((first + delta * max(output_frames - 1, 0)) * SAFETY_MARGIN)
+
+
+def _encoded_size(frames: list[Image.Image], fps: float) -> int:
+    """編碼為 GIF 後的位元組數"""
+    buffer = io.BytesIO()
+    frames[0].save(
+        buffer,
+        format="GIF",
+        save_all=True,
+        append_images=frames[1:],
+        duration=int(1000 / fps),
+        loop=0,
+        optimize=True,
+    )
+    return buffer.tell()
+
+
+def candidate_widths(source_width: int) -> list[int]:
+    """依寬度縮放比例列出候選寬度（由大到小）"""
+    widths: list[int] = []
+    for scale in WIDTH_SCALES:
+        width = max(int(source_width * scale), min(MIN_WIDTH, source_width))
+        if width not in widths:
+            widths.append(width)
+    return widths
+
+
+def _first_fit(count: int, start: int, fits: Callable[[int], bool]) -> int | None:
+    """在 [start, count) 中二分搜尋第一個符合的索引（fits 須為單調：一旦符合，之後皆符合）"""
+    low, high = start, count
+    while low < high:
+        middle = (low + high) // 2
+        if fits(middle):
+            high = middle
+        else:
+            low = middle + 1
+    return low if low < count else None
+
+
+def video_to_gif_target_size(
+    video_path: str,
+    output_path: str,
+    target_bytes: int,
+    frame_interval: int = 1,
+    fps: float = 10.0,
+    max_width: int | None = None,
+    progress_callback: Callable[[int, int], None] | None = None,
+    transform: FrameTransform | None = None,
+) -> GifSizeReport:
+    """
+    將影片轉換為不超過目標大小的 GIF
+
+    以取樣幀估算候選設定的輸出大小，二分搜尋畫質最高且符合目標的設定後執行完整編碼；
+    若實際大小仍超出目標，依實際/估計比例修正估計值後繼續搜尋較小的設定。
+
+    Args:
+        video_path: 影片檔案路徑
+        output_path: 輸出 GIF 路徑
+        target_bytes: 目標檔案大小（位元組）
+        frame_interval: 基準幀間隔
+        fps: 基準 GIF FPS
+        max_width: 最大寬度（None = 使用影片原始寬度）
+        progress_callback: 進度回調函數
+        transform: 裁切、旋轉與翻轉設定
+
+    Returns:
+        執行結果報告
+    """
+    if target_bytes <= 0:
+        raise ValueError("目標大小必須大於 0")
+
+    sample_started = time.perf_counter()
+    samples, total_frames = read_sample_segments(
+        video_path, frame_interval, max_width, transform=transform
+    )
+    sample_seconds = time.perf_counter() - sample_started
+    widths = candidate_widths(samples[0][0].width)
+    last_rung = len(QUALITY_LADDER) - 1
+    # 二分搜尋所需的最多取樣評估次數（僅用於顯示進度）
+    max_evaluations = math.ceil(math.log2(len(widths) + 1)) + math.ceil(
+        math.log2(len(QUALITY_LADDER) + 1)
+    )
+
+    estimates: dict[GifCandidate, int] = {}
+    correction = 1.0
+
+    def estimate(candidate: GifCandidate) -> int:
+        nonlocal sample_seconds
+        if candidate not in estimates:
+            started = time.perf_counter()
+            output_frames = math.ceil(total_frames / (frame_interval * candidate.frame_step))
+            estimates[candidate] = estimate_gif_size(
+                samples, candidate, output_frames, fps / candidate.frame_step
+            )
+            sample_seconds += time.perf_counter() - started
+            if progress_callback:
+                progress_callback(len(estimates), max(max_evaluations, len(estimates)))
+        return estimates[candidate]
+
+    def fits(width_index: int, rung: int) -> bool:
+        candidate = GifCandidate(widths[width_index], *QUALITY_LADDER[rung])
+        return estimate(candidate) * correction <= target_bytes
+
+    def search(width_start: int, rung_start: int) -> tuple[int, int] | None:
+        """
+        找出畫質最高且估計大小符合目標的設定
+
+        寬度越小、品質階梯越後面，檔案越小：先以最小品質找出最大的可行寬度，
+        再於該寬度找出最高的可行品質。
+        """
+        width_index = _first_fit(len(widths), width_start, lambda w: fits(w, last_rung))
+        if width_index is None:
+            return None
+        start = rung_start if width_index == width_start else 0
+        rung = _first_fit(len(QUALITY_LADDER), start, lambda r: fits(width_index, r))
+        return (width_index, rung) if rung is not None else None
+
+    full_encodes = 0
+    encode_seconds = 0.0
+    output_bytes = 0
+    chosen: GifCandidate | None = None
+    position = search(0, 0)
+
+    while position is not None:
+        width_index, rung = position
+        chosen = GifCandidate(widths[width_index], *QUALITY_LADDER[rung])
+        started = time.perf_counter()
+        VideoConverter.video_to_gif(
+            video_path,
+            output_path,
+            frame_interval * chosen.frame_step,
+            fps / chosen.frame_step,
+            chosen.width,
+            progress_callback,
+            colors=chosen.colors,
+            dither=chosen.dither,
+            transform=transform,
+        )
+        encode_seconds += time.perf_counter() - started
+        full_encodes += 1
+        output_bytes = os.path.getsize(output_path)
+        if output_bytes <= target_bytes or full_encodes >= MAX_FULL_ENCODES:
+            break
+
+        # 依實際/估計比例修正後，從下一組設定繼續搜尋
+        correction = output_bytes / max(estimates[chosen], 1)
+        if rung < last_rung:
+            position = search(width_index, rung + 1)
+        elif width_index + 1 < len(widths):
+            position = search(width_index + 1, 0)
+        else:
+            position = None
+
+    if chosen is None:
+        raise ValueError(
+            f"即使使用最小設定，估計大小仍超過目標 {target_bytes / 1024:.1f} KB，"
+            "請縮短影片或提高目標大小"
+        )
+
+    return GifSizeReport(
+        output_path=output_path,
+        target_bytes=target_bytes,
+        output_bytes=output_bytes,
+        candidate=chosen,
+        frame_interval=frame_interval,
+        fps=fps,
+        evaluated=len(estimates),
+        full_encodes=full_encodes,
+        sample_seconds=sample_seconds,
+        encode_seconds=encode_seconds,
+        exhausted=position is None,
+    )
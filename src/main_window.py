@@ -5,11 +5,14 @@ Video2Img 主視窗 UI
 from __future__ import annotations
 
 import os
+import time
 from pathlib import Path
 
+from PIL import Image
 from PySide6.QtCore import Qt, QThread, Signal
 from PySide6.QtWidgets import (
     QApplication,
+    QCheckBox,
     QComboBox,
     QFileDialog,
     QGroupBox,
@@ -28,7 +31,14 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from .animation import ANIMATION_EXTENSIONS, DEFAULT_DEDUPE_THRESHOLD
 from .converter import VideoConverter
+from .encoder_profiles import DEFAULT_PROFILE, PROFILES, get_profile
+from .gif_budget import video_to_gif_target_size
+from .probe import MediaInfo, probe_media
+from .resources import GOVERNOR, estimate_job_bytes
+from .roi_dialog import RoiSelectDialog
+from .transform import FrameTransform, format_crop, parse_crop
 
 
 class WorkerThread(QThread):
@@ -46,12 +56,31 @@ class WorkerThread(QThread):
 
     def run(self):
         try:
-            result = self.task_func(*self.args, **self.kwargs)
+            # 依 CPU 預算分配此任務的執行緒數與優先權
+            with GOVERNOR.job():
+                result = self.task_func(*self.args, **self.kwargs)
             self.finished.emit(str(result))
         except Exception as e:
             self.error.emit(str(e))
 
 
+class ProbeThread(QThread):
+    """背景探測影片資訊"""
+
+    probed = Signal(object)  # MediaInfo
+    failed = Signal(str)  # error message
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+
+    def run(self):
+        try:
+            self.probed.emit(probe_media(self.path))
+        except ValueError as e:
+            self.failed.emit(str(e))
+
+
 class MainWindow(QMainWindow):
     """主視窗"""
 
@@ -62,6 +91,10 @@ class MainWindow(QMainWindow):
 
         self.worker: WorkerThread | None = None
         self.selected_images: list[str] = []
+        self.probe_threads: list[ProbeThread] = []
+        # 背景探測完成的影片資訊（以絕對路徑為鍵），供開始任務時估算記憶體
+        self.media_info: dict[str, MediaInfo] = {}
+        self._task_started_at = 0.0
 
         self._setup_ui()
 
@@ -97,6 +130,12 @@ class MainWindow(QMainWindow):
         # Tab 3: 影片轉 GIF
         tab_widget.addTab(self._create_video_to_gif_tab(), "影片 → GIF")
 
+        # Tab 4: GIF 最佳化
+        tab_widget.addTab(self._create_gif_to_gif_tab(), "GIF 最佳化")
+
+        # Tab 5: 設定
+        tab_widget.addTab(self._create_settings_tab(), "設定")
+
         # 進度條
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
@@ -124,6 +163,14 @@ class MainWindow(QMainWindow):
         input_layout.addWidget(browse_btn)
         layout.addWidget(input_group)
 
+        # 影片資訊
+        self.v2i_info_label = QLabel("")
+        self.v2i_info_label.setStyleSheet("color: #7f8c8d;")
+        layout.addWidget(self.v2i_info_label)
+        self.v2i_input_edit.editingFinished.connect(
+            lambda: self._probe_video(self.v2i_input_edit, self.v2i_info_label)
+        )
+
         # 輸出設定
         output_group = QGroupBox("輸出設定")
         output_layout = QVBoxLayout(output_group)
@@ -159,6 +206,9 @@ class MainWindow(QMainWindow):
         format_layout.addStretch()
         output_layout.addLayout(format_layout)
 
+        # 裁切、旋轉與翻轉
+        output_layout.addLayout(self._create_transform_options("v2i"))
+
         layout.addWidget(output_group)
 
         # 執行按鈕
@@ -231,11 +281,39 @@ class MainWindow(QMainWindow):
         type_layout = QHBoxLayout()
         type_layout.addWidget(QLabel("輸出類型:"))
         self.i2m_type_combo = QComboBox()
-        self.i2m_type_combo.addItems(["GIF", "MP4", "AVI", "MOV", "WEBM"])
+        self.i2m_type_combo.addItems(["GIF", "WEBP", "APNG", "MP4", "AVI", "MOV", "WEBM"])
         type_layout.addWidget(self.i2m_type_combo)
         type_layout.addStretch()
         output_layout.addLayout(type_layout)
 
+        # WebP 品質
+        output_layout.addLayout(self._create_webp_options("i2m"))
+
+        # 重複幀
+        self.i2m_dedupe_check = QCheckBox("合併重複幀（延長顯示時間）")
+        self.i2m_dedupe_check.setToolTip(
+            "連續相同或幾乎相同的圖片合併為一幀，減少檔案大小與編碼時間"
+        )
+        output_layout.addWidget(self.i2m_dedupe_check)
+
+        # 影片編碼設定檔
+        profile_layout = QHBoxLayout()
+        profile_layout.addWidget(QLabel("編碼設定檔:"))
+        self.i2m_profile_combo = QComboBox()
+        self.i2m_profile_combo.setToolTip(
+            "快速：編碼最快；平衡：速度與大小兼顧；封存：檔案最小但編碼最慢"
+        )
+        profile_layout.addWidget(self.i2m_profile_combo)
+        self.i2m_profile_label = QLabel("")
+        self.i2m_profile_label.setStyleSheet("color: #7f8c8d;")
+        profile_layout.addWidget(self.i2m_profile_label)
+        profile_layout.addStretch()
+        output_layout.addLayout(profile_layout)
+        self.i2m_profile_combo.currentIndexChanged.connect(self._update_profile_label)
+
+        self.i2m_type_combo.currentTextChanged.connect(self._on_i2m_type_changed)
+        self._on_i2m_type_changed(self.i2m_type_combo.currentText())
+
         layout.addWidget(output_group)
 
         # 執行按鈕
@@ -268,6 +346,14 @@ class MainWindow(QMainWindow):
         input_layout.addWidget(browse_btn)
         layout.addWidget(input_group)
 
+        # 影片資訊
+        self.v2g_info_label = QLabel("")
+        self.v2g_info_label.setStyleSheet("color: #7f8c8d;")
+        layout.addWidget(self.v2g_info_label)
+        self.v2g_input_edit.editingFinished.connect(
+            lambda: self._probe_video(self.v2g_input_edit, self.v2g_info_label)
+        )
+
         # 輸出設定
         output_group = QGroupBox("輸出設定")
         output_layout = QVBoxLayout(output_group)
@@ -276,7 +362,7 @@ class MainWindow(QMainWindow):
         file_layout = QHBoxLayout()
         file_layout.addWidget(QLabel("輸出檔案:"))
         self.v2g_output_edit = QLineEdit()
-        self.v2g_output_edit.setPlaceholderText("選擇輸出 GIF 檔案...")
+        self.v2g_output_edit.setPlaceholderText("選擇輸出動畫檔案...")
         file_layout.addWidget(self.v2g_output_edit)
         file_browse_btn = QPushButton("瀏覽")
         file_browse_btn.clicked.connect(self._browse_output_file_v2g)
@@ -315,6 +401,50 @@ class MainWindow(QMainWindow):
         width_layout.addStretch()
         output_layout.addLayout(width_layout)
 
+        # 裁切、旋轉與翻轉
+        output_layout.addLayout(self._create_transform_options("v2g"))
+
+        # 目標大小
+        target_layout = QHBoxLayout()
+        target_layout.addWidget(QLabel("目標大小 KB (0=不限制):"))
+        self.v2g_target_size_spin = QSpinBox()
+        self.v2g_target_size_spin.setRange(0, 1024 * 1024)
+        self.v2g_target_size_spin.setValue(0)
+        self.v2g_target_size_spin.setSingleStep(100)
+        self.v2g_target_size_spin.setToolTip(
+            "自動調整寬度、FPS、顏色數與抖色，使 GIF 不超過此大小；0 表示不限制"
+        )
+        target_layout.addWidget(self.v2g_target_size_spin)
+        target_layout.addStretch()
+        output_layout.addLayout(target_layout)
+
+        # 輸出格式
+        format_layout = QHBoxLayout()
+        format_layout.addWidget(QLabel("輸出格式:"))
+        self.v2g_format_combo = QComboBox()
+        self.v2g_format_combo.addItems(["GIF", "WEBP", "APNG"])
+        format_layout.addWidget(self.v2g_format_combo)
+        format_layout.addStretch()
+        output_layout.addLayout(format_layout)
+
+        # WebP 品質
+        output_layout.addLayout(self._create_webp_options("v2g"))
+
+        # 重複幀與時間戳
+        timing_layout = QHBoxLayout()
+        self.v2g_dedupe_check = QCheckBox("合併重複幀")
+        self.v2g_dedupe_check.setToolTip(
+            "連續相同或幾乎相同的畫面合併為一幀，減少檔案大小與編碼時間"
+        )
+        timing_layout.addWidget(self.v2g_dedupe_check)
+        self.v2g_timestamps_check = QCheckBox("依來源時間戳（可變幀率）")
+        self.v2g_timestamps_check.setToolTip("依影片實際的影格時間決定每幀顯示時間，忽略 GIF FPS")
+        timing_layout.addWidget(self.v2g_timestamps_check)
+        timing_layout.addStretch()
+        output_layout.addLayout(timing_layout)
+        self.v2g_format_combo.currentTextChanged.connect(self._on_v2g_format_changed)
+        self._update_webp_options("v2g", self.v2g_format_combo.currentText())
+
         layout.addWidget(output_group)
 
         # 執行按鈕
@@ -330,6 +460,278 @@ class MainWindow(QMainWindow):
         layout.addStretch()
         return widget
 
+    def _create_gif_to_gif_tab(self) -> QWidget:
+        """建立 GIF 最佳化頁籤"""
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        layout.setSpacing(12)
+
+        # 輸入檔案
+        input_group = QGroupBox("輸入動畫")
+        input_layout = QHBoxLayout(input_group)
+        self.g2g_input_edit = QLineEdit()
+        self.g2g_input_edit.setPlaceholderText("選擇 GIF 或其他動畫檔案...")
+        input_layout.addWidget(self.g2g_input_edit)
+        browse_btn = QPushButton("瀏覽")
+        browse_btn.clicked.connect(self._browse_input_file_g2g)
+        input_layout.addWidget(browse_btn)
+        layout.addWidget(input_group)
+
+        # 輸出設定
+        output_group = QGroupBox("輸出設定")
+        output_layout = QVBoxLayout(output_group)
+
+        # 輸出檔案
+        file_layout = QHBoxLayout()
+        file_layout.addWidget(QLabel("輸出檔案:"))
+        self.g2g_output_edit = QLineEdit()
+        self.g2g_output_edit.setPlaceholderText("選擇輸出 GIF 檔案...")
+        file_layout.addWidget(self.g2g_output_edit)
+        file_browse_btn = QPushButton("瀏覽")
+        file_browse_btn.clicked.connect(self._browse_output_file_g2g)
+        file_layout.addWidget(file_browse_btn)
+        output_layout.addLayout(file_layout)
+
+        # 幀步進
+        step_layout = QHBoxLayout()
+        step_layout.addWidget(QLabel("每幾幀保留一幀:"))
+        self.g2g_step_spin = QSpinBox()
+        self.g2g_step_spin.setRange(1, 100)
+        self.g2g_step_spin.setValue(1)
+        self.g2g_step_spin.setToolTip("捨棄幀的顯示時間會併入保留幀，播放長度不變")
+        step_layout.addWidget(self.g2g_step_spin)
+        step_layout.addStretch()
+        output_layout.addLayout(step_layout)
+
+        # 最大寬度
+        width_layout = QHBoxLayout()
+        width_layout.addWidget(QLabel("最大寬度 (0=不限制):"))
+        self.g2g_max_width_spin = QSpinBox()
+        self.g2g_max_width_spin.setRange(0, 4096)
+        self.g2g_max_width_spin.setValue(0)
+        width_layout.addWidget(self.g2g_max_width_spin)
+        width_layout.addStretch()
+        output_layout.addLayout(width_layout)
+
+        # 顏色
+        colors_layout = QHBoxLayout()
+        colors_layout.addWidget(QLabel("顏色數:"))
+        self.g2g_colors_spin = QSpinBox()
+        self.g2g_colors_spin.setRange(2, 256)
+        self.g2g_colors_spin.setValue(256)
+        colors_layout.addWidget(self.g2g_colors_spin)
+        self.g2g_dither_check = QCheckBox("抖色")
+        self.g2g_dither_check.setChecked(True)
+        colors_layout.addWidget(self.g2g_dither_check)
+        self.g2g_dedupe_check = QCheckBox("合併重複幀")
+        colors_layout.addWidget(self.g2g_dedupe_check)
+        colors_layout.addStretch()
+        output_layout.addLayout(colors_layout)
+
+        layout.addWidget(output_group)
+
+        # 執行按鈕
+        convert_btn = QPushButton("開始最佳化")
+        convert_btn.setStyleSheet(
+            "QPushButton { background-color: #e67e22; color: white; "
+            "font-size: 14px; padding: 10px; border-radius: 5px; }"
+            "QPushButton:hover { background-color: #d35400; }"
+        )
+        convert_btn.clicked.connect(self._start_gif_to_gif)
+        layout.addWidget(convert_btn)
+
+        layout.addStretch()
+        return widget
+
+    def _create_settings_tab(self) -> QWidget:
+        """建立設定頁籤"""
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        layout.setSpacing(12)
+
+        # CPU 資源
+        cpu_group = QGroupBox("CPU 資源")
+        cpu_layout = QVBoxLayout(cpu_group)
+
+        budget_layout = QHBoxLayout()
+        budget_layout.addWidget(QLabel("CPU 預算（執行緒）:"))
+        self.cpu_budget_spin = QSpinBox()
+        self.cpu_budget_spin.setRange(1, (os.cpu_count() or 1) * 4)
+        self.cpu_budget_spin.setValue(GOVERNOR.cpu_budget)
+        self.cpu_budget_spin.setToolTip(
+            "所有轉換合計使用的執行緒數，由同時執行的任務平分（OpenCV、ffmpeg 與幀處理）"
+        )
+        budget_layout.addWidget(self.cpu_budget_spin)
+        budget_layout.addStretch()
+        cpu_layout.addLayout(budget_layout)
+
+        job_layout = QHBoxLayout()
+        job_layout.addWidget(QLabel("單一任務上限 (0=不限制):"))
+        self.job_threads_spin = QSpinBox()
+        self.job_threads_spin.setRange(0, (os.cpu_count() or 1) * 4)
+        self.job_threads_spin.setValue(GOVERNOR.job_threads or 0)
+        job_layout.addWidget(self.job_threads_spin)
+        job_layout.addStretch()
+        cpu_layout.addLayout(job_layout)
+
+        self.background_check = QCheckBox("以低優先權執行轉換（不影響其他程式）")
+        self.background_check.setChecked(GOVERNOR.background)
+        cpu_layout.addWidget(self.background_check)
+
+        self.cpu_budget_spin.valueChanged.connect(self._apply_resource_settings)
+        self.job_threads_spin.valueChanged.connect(self._apply_resource_settings)
+        self.background_check.toggled.connect(self._apply_resource_settings)
+
+        layout.addWidget(cpu_group)
+
+        # 記憶體
+        memory_group = QGroupBox("記憶體")
+        memory_layout = QHBoxLayout(memory_group)
+        memory_layout.addWidget(QLabel("幀緩衝記憶體預算 (MB):"))
+        self.memory_budget_spin = QSpinBox()
+        self.memory_budget_spin.setRange(64, 1024 * 1024)
+        self.memory_budget_spin.setSingleStep(256)
+        self.memory_budget_spin.setValue(GOVERNOR.memory_budget // (1024 * 1024))
+        self.memory_budget_spin.setToolTip(
+            "所有任務合計保留在記憶體中的幀上限；超出時改為逐幀寫入輸出檔，開始前預估會超出時將提示"
+        )
+        self.memory_budget_spin.valueChanged.connect(self._apply_resource_settings)
+        memory_layout.addWidget(self.memory_budget_spin)
+        memory_layout.addStretch()
+        layout.addWidget(memory_group)
+
+        layout.addStretch()
+        return widget
+
+    def _apply_resource_settings(self):
+        """套用 CPU 資源設定"""
+        GOVERNOR.configure(
+            cpu_budget=self.cpu_budget_spin.value(),
+            job_threads=self.job_threads_spin.value(),
+            background=self.background_check.isChecked(),
+            memory_budget=self.memory_budget_spin.value() * 1024 * 1024,
+        )
+
+    def _create_transform_options(self, prefix: str) -> QHBoxLayout:
+        """建立裁切、旋轉與翻轉選項"""
+        transform_layout = QHBoxLayout()
+        transform_layout.addWidget(QLabel("裁切:"))
+        crop_edit = QLineEdit()
+        crop_edit.setPlaceholderText("x,y,寬,高（空白 = 不裁切）")
+        transform_layout.addWidget(crop_edit)
+        select_btn = QPushButton("選取區域")
+        select_btn.clicked.connect(lambda: self._select_roi(prefix))
+        transform_layout.addWidget(select_btn)
+
+        transform_layout.addWidget(QLabel("旋轉:"))
+        rotate_combo = QComboBox()
+        for angle in (0, 90, 180, 270):
+            rotate_combo.addItem(f"{angle}°", angle)
+        transform_layout.addWidget(rotate_combo)
+
+        transform_layout.addWidget(QLabel("翻轉:"))
+        flip_combo = QComboBox()
+        flip_combo.addItem("不翻轉", None)
+        flip_combo.addItem("水平", "h")
+        flip_combo.addItem("垂直", "v")
+        flip_combo.addItem("水平 + 垂直", "hv")
+        transform_layout.addWidget(flip_combo)
+
+        setattr(self, f"{prefix}_crop_edit", crop_edit)
+        setattr(self, f"{prefix}_rotate_combo", rotate_combo)
+        setattr(self, f"{prefix}_flip_combo", flip_combo)
+        return transform_layout
+
+    def _get_transform(self, prefix: str) -> FrameTransform | None:
+        """依 UI 設定建立影格轉換（不轉換時回傳 None）"""
+        transform = FrameTransform(
+            crop=parse_crop(getattr(self, f"{prefix}_crop_edit").text()),
+            rotate=getattr(self, f"{prefix}_rotate_combo").currentData(),
+            flip=getattr(self, f"{prefix}_flip_combo").currentData(),
+        )
+        return None if transform.is_identity else transform
+
+    def _select_roi(self, prefix: str):
+        """開啟區域選取對話框"""
+        video_path = getattr(self, f"{prefix}_input_edit").text().strip()
+        if not video_path:
+            QMessageBox.warning(self, "警告", "請先選擇輸入影片檔案")
+            return
+
+        crop_edit: QLineEdit = getattr(self, f"{prefix}_crop_edit")
+        try:
+            dialog = RoiSelectDialog(video_path, parse_crop(crop_edit.text()), self)
+        except ValueError as e:
+            QMessageBox.warning(self, "警告", str(e))
+            return
+        if dialog.exec():
+            crop_edit.setText(format_crop(dialog.selected_crop()))
+
+    def _create_webp_options(self, prefix: str) -> QHBoxLayout:
+        """建立 WebP 品質與無損選項"""
+        webp_layout = QHBoxLayout()
+        webp_layout.addWidget(QLabel("WebP 品質:"))
+        quality_spin = QSpinBox()
+        quality_spin.setRange(0, 100)
+        quality_spin.setValue(80)
+        quality_spin.setToolTip("有損壓縮品質；無損模式下代表壓縮力度")
+        webp_layout.addWidget(quality_spin)
+        lossless_check = QCheckBox("無損")
+        webp_layout.addWidget(lossless_check)
+        webp_layout.addStretch()
+        setattr(self, f"{prefix}_quality_spin", quality_spin)
+        setattr(self, f"{prefix}_lossless_check", lossless_check)
+        return webp_layout
+
+    def _update_webp_options(self, prefix: str, output_type: str):
+        """僅在輸出 WebP 時啟用 WebP 選項"""
+        enabled = output_type.lower() == "webp"
+        getattr(self, f"{prefix}_quality_spin").setEnabled(enabled)
+        getattr(self, f"{prefix}_lossless_check").setEnabled(enabled)
+
+    def _on_i2m_type_changed(self, output_type: str):
+        """切換圖片轉媒體的輸出類型"""
+        self._update_webp_options("i2m", output_type)
+        self.i2m_dedupe_check.setEnabled(output_type.lower() in ANIMATION_EXTENSIONS)
+
+        # 依容器列出可用的編碼設定檔
+        profiles = PROFILES.get(output_type.lower(), {})
+        self.i2m_profile_combo.blockSignals(True)
+        self.i2m_profile_combo.clear()
+        for name, profile in profiles.items():
+            self.i2m_profile_combo.addItem(profile.label, name)
+        default_index = self.i2m_profile_combo.findData(DEFAULT_PROFILE)
+        self.i2m_profile_combo.setCurrentIndex(max(default_index, 0))
+        self.i2m_profile_combo.blockSignals(False)
+        self.i2m_profile_combo.setEnabled(bool(profiles))
+        self._update_profile_label()
+
+    def _update_profile_label(self):
+        """顯示目前編碼設定檔的參數"""
+        name = self.i2m_profile_combo.currentData()
+        if name is None:
+            self.i2m_profile_label.setText("")
+            return
+        profile = get_profile(self.i2m_type_combo.currentText().lower(), name)
+        self.i2m_profile_label.setText(
+            " ".join([profile.codec, *profile.ffmpeg_params(), "-pix_fmt", profile.pixel_format])
+        )
+
+    def _on_v2g_format_changed(self, output_type: str):
+        """切換影片轉動畫的輸出格式"""
+        self._update_webp_options("v2g", output_type)
+        # 目標大小模式僅支援 GIF
+        self.v2g_target_size_spin.setEnabled(output_type.lower() == "gif")
+        output_path = self.v2g_output_edit.text().strip()
+        if output_path:
+            suffix = ANIMATION_EXTENSIONS[output_type.lower()]
+            self.v2g_output_edit.setText(str(Path(output_path).with_suffix(suffix)))
+
+    @staticmethod
+    def _dedupe_threshold(check: QCheckBox) -> float | None:
+        """依勾選狀態回傳合併重複幀的門檻"""
+        return DEFAULT_DEDUPE_THRESHOLD if check.isChecked() else None
+
     # === 瀏覽檔案方法 ===
 
     def _browse_video_for_images(self):
@@ -342,6 +744,7 @@ class MainWindow(QMainWindow):
         )
         if file_path:
             self.v2i_input_edit.setText(file_path)
+            self._probe_video(self.v2i_input_edit, self.v2i_info_label)
             # 自動設定輸出目錄
             if not self.v2i_output_dir_edit.text():
                 output_dir = str(Path(file_path).parent / Path(file_path).stem)
@@ -395,8 +798,8 @@ class MainWindow(QMainWindow):
     def _browse_output_file_i2m(self):
         """瀏覽輸出檔案（圖片轉媒體）"""
         output_type = self.i2m_type_combo.currentText().lower()
-        if output_type == "gif":
-            filter_str = "GIF 檔案 (*.gif)"
+        if output_type in ANIMATION_EXTENSIONS:
+            filter_str = f"{output_type.upper()} 檔案 (*{ANIMATION_EXTENSIONS[output_type]})"
         else:
             filter_str = f"影片檔案 (*.{output_type})"
 
@@ -414,27 +817,156 @@ class MainWindow(QMainWindow):
         )
         if file_path:
             self.v2g_input_edit.setText(file_path)
+            self._probe_video(self.v2g_input_edit, self.v2g_info_label)
             # 自動設定輸出檔案
             if not self.v2g_output_edit.text():
-                output_path = str(Path(file_path).with_suffix(".gif"))
+                suffix = ANIMATION_EXTENSIONS[self.v2g_format_combo.currentText().lower()]
+                output_path = str(Path(file_path).with_suffix(suffix))
                 self.v2g_output_edit.setText(output_path)
 
     def _browse_output_file_v2g(self):
         """瀏覽輸出檔案（影片轉 GIF）"""
+        output_type = self.v2g_format_combo.currentText().lower()
+        filter_str = f"{output_type.upper()} 檔案 (*{ANIMATION_EXTENSIONS[output_type]})"
+        file_path, _ = QFileDialog.getSaveFileName(self, "選擇輸出檔案", "", filter_str)
+        if file_path:
+            self.v2g_output_edit.setText(file_path)
+
+    # === 影片資訊 ===
+
+    def _probe_video(self, edit: QLineEdit, label: QLabel):
+        """在背景探測影片資訊並顯示於標籤"""
+        video_path = edit.text().strip()
+        if not video_path:
+            label.setText("")
+            return
+
+        label.setText("讀取影片資訊...")
+        thread = ProbeThread(video_path)
+
+        def on_probed(info: MediaInfo):
+            self.media_info[info.path] = info
+            # 忽略使用者已切換檔案後才完成的探測結果
+            if os.path.abspath(edit.text().strip()) == info.path:
+                label.setText(info.summary())
+
+        def on_failed(error_msg: str):
+            if edit.text().strip() == video_path:
+                label.setText(f"無法讀取影片資訊：{error_msg}")
+
+        thread.probed.connect(on_probed)
+        thread.failed.connect(on_failed)
+        thread.finished.connect(lambda: self.probe_threads.remove(thread))
+        self.probe_threads.append(thread)
+        thread.start()
+
+    def _browse_input_file_g2g(self):
+        """瀏覽輸入動畫（GIF 最佳化）"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "選擇動畫檔案",
+            "",
+            "動畫檔案 (*.gif *.webp *.png *.apng);;所有檔案 (*.*)",
+        )
+        if file_path:
+            self.g2g_input_edit.setText(file_path)
+            # 自動設定輸出檔案
+            if not self.g2g_output_edit.text():
+                path = Path(file_path)
+                output_path = str(path.with_name(f"{path.stem}_optimized.gif"))
+                self.g2g_output_edit.setText(output_path)
+
+    def _browse_output_file_g2g(self):
+        """瀏覽輸出檔案（GIF 最佳化）"""
         file_path, _ = QFileDialog.getSaveFileName(
             self, "選擇輸出 GIF 檔案", "", "GIF 檔案 (*.gif)"
         )
         if file_path:
-            self.v2g_output_edit.setText(file_path)
+            self.g2g_output_edit.setText(file_path)
 
     # === 轉換方法 ===
 
+    def _confirm_memory(self, estimated_bytes: int) -> bool:
+        """預估記憶體用量超過預算時詢問是否繼續"""
+        if not GOVERNOR.exceeds_memory(estimated_bytes):
+            return True
+        share = GOVERNOR.memory_budget // (GOVERNOR.active_jobs + 1)
+        reply = QMessageBox.question(
+            self,
+            "記憶體不足",
+            f"此任務預估需要 {estimated_bytes / 1024**2:.0f} MB 記憶體，"
+            f"超過可用的 {share / 1024**2:.0f} MB 預算。\n"
+            "超出預算後將改為逐幀寫入輸出檔，記憶體用量維持在預算內，"
+            "但無法使用整體最佳化，輸出檔可能較大。是否繼續？",
+        )
+        return reply == QMessageBox.StandardButton.Yes
+
+    def _estimate_video_animation_bytes(
+        self,
+        video_path: str,
+        frame_interval: int,
+        max_width: int | None,
+        transform: FrameTransform | None,
+        output_format: str,
+    ) -> int:
+        """估算影片轉動畫需保留的幀記憶體（使用背景探測的結果，尚未探測完成時不估算）"""
+        info = self.media_info.get(os.path.abspath(video_path))
+        if info is None:
+            return 0
+        width, height = info.width, info.height
+        if transform is not None:
+            if transform.crop is not None:
+                width, height = min(transform.crop[2], width), min(transform.crop[3], height)
+            if transform.rotate % 180:
+                width, height = height, width
+        if max_width and width > max_width:
+            width, height = max_width, int(height * max_width / width)
+        channels = 1 if output_format == "gif" else 3
+        return estimate_job_bytes(width, height, info.frame_count // frame_interval, channels)
+
+    @staticmethod
+    def _estimate_image_animation_bytes(
+        image_paths: list[str], output_format: str, max_width: int | None = None
+    ) -> int:
+        """以第一個檔案的尺寸與幀數估算圖片轉動畫需保留的幀記憶體"""
+        try:
+            with Image.open(image_paths[0]) as img:
+                width, height = img.size
+                frames_per_file = getattr(img, "n_frames", 1) if len(image_paths) == 1 else 1
+        except OSError:
+            return 0
+        if max_width and width > max_width:
+            width, height = max_width, int(height * max_width / width)
+        channels = 1 if output_format == "gif" else 3
+        return estimate_job_bytes(width, height, len(image_paths) * frames_per_file, channels)
+
+    def _begin_task(self):
+        """重設進度條並記錄開始時間"""
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(0)
+        self.status_label.setText("開始處理...")
+        self._task_started_at = time.monotonic()
+
+    @staticmethod
+    def _format_eta(seconds: float) -> str:
+        """格式化剩餘時間"""
+        minutes, seconds = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        if hours:
+            return f"{hours}:{minutes:02d}:{seconds:02d}"
+        return f"{minutes:02d}:{seconds:02d}"
+
     def _update_progress(self, current: int, total: int):
         """更新進度條"""
         self.progress_bar.setMaximum(total)
         self.progress_bar.setValue(current)
         percentage = int(current / total * 100) if total > 0 else 0
-        self.status_label.setText(f"處理中... {percentage}%")
+        status = f"處理中... {percentage}%"
+        elapsed = time.monotonic() - self._task_started_at
+        if 0 < current < total and elapsed > 1.0:
+            remaining = elapsed * (total - current) / current
+            status += f"（剩餘約 {self._format_eta(remaining)}）"
+        self.status_label.setText(status)
 
     def _on_task_finished(self, result: str):
         """任務完成"""
@@ -464,10 +996,13 @@ class MainWindow(QMainWindow):
 
         frame_interval = self.v2i_interval_spin.value()
         output_format = self.v2i_format_combo.currentText()
+        try:
+            transform = self._get_transform("v2i")
+        except ValueError as e:
+            QMessageBox.warning(self, "警告", str(e))
+            return
 
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setValue(0)
-        self.status_label.setText("開始處理...")
+        self._begin_task()
 
         self.worker = WorkerThread(
             VideoConverter.video_to_images,
@@ -476,6 +1011,7 @@ class MainWindow(QMainWindow):
             frame_interval,
             output_format,
             self._update_progress,
+            transform,
         )
         self.worker.finished.connect(self._on_task_finished)
         self.worker.error.connect(self._on_task_error)
@@ -495,18 +1031,25 @@ class MainWindow(QMainWindow):
         fps = self.i2m_fps_spin.value()
         output_type = self.i2m_type_combo.currentText().lower()
 
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setValue(0)
-        self.status_label.setText("開始處理...")
+        if output_type in ANIMATION_EXTENSIONS and not self._confirm_memory(
+            self._estimate_image_animation_bytes(self.selected_images, output_type)
+        ):
+            return
+
+        self._begin_task()
 
-        if output_type == "gif":
+        if output_type in ANIMATION_EXTENSIONS:
             self.worker = WorkerThread(
-                VideoConverter.images_to_gif,
+                VideoConverter.images_to_animation,
                 self.selected_images.copy(),
                 output_path,
                 float(fps),
                 0,
                 self._update_progress,
+                output_format=output_type,
+                lossless=self.i2m_lossless_check.isChecked(),
+                quality=self.i2m_quality_spin.value(),
+                dedupe_threshold=self._dedupe_threshold(self.i2m_dedupe_check),
             )
         else:
             self.worker = WorkerThread(
@@ -516,6 +1059,7 @@ class MainWindow(QMainWindow):
                 float(fps),
                 "libx264",
                 self._update_progress,
+                profile=get_profile(output_type, self.i2m_profile_combo.currentData()),
             )
 
         self.worker.finished.connect(self._on_task_finished)
@@ -531,7 +1075,7 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "警告", "請選擇輸入影片檔案")
             return
         if not output_path:
-            QMessageBox.warning(self, "警告", "請選擇輸出 GIF 檔案")
+            QMessageBox.warning(self, "警告", "請選擇輸出檔案")
             return
 
         frame_interval = self.v2g_interval_spin.value()
@@ -539,18 +1083,88 @@ class MainWindow(QMainWindow):
         max_width = self.v2g_max_width_spin.value()
         if max_width == 0:
             max_width = None
+        output_format = self.v2g_format_combo.currentText().lower()
+        target_kb = self.v2g_target_size_spin.value()
+        try:
+            transform = self._get_transform("v2g")
+        except ValueError as e:
+            QMessageBox.warning(self, "警告", str(e))
+            return
 
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setValue(0)
-        self.status_label.setText("開始處理...")
+        estimated_bytes = self._estimate_video_animation_bytes(
+            video_path, frame_interval, max_width, transform, output_format
+        )
+        if not self._confirm_memory(estimated_bytes):
+            return
+
+        self._begin_task()
+
+        if target_kb > 0 and output_format == "gif":
+            self.worker = WorkerThread(
+                video_to_gif_target_size,
+                video_path,
+                output_path,
+                target_kb * 1024,
+                frame_interval,
+                float(fps),
+                max_width,
+                self._update_progress,
+                transform,
+            )
+        else:
+            self.worker = WorkerThread(
+                VideoConverter.video_to_animation,
+                video_path,
+                output_path,
+                frame_interval,
+                float(fps),
+                max_width,
+                self._update_progress,
+                output_format=output_format,
+                lossless=self.v2g_lossless_check.isChecked(),
+                quality=self.v2g_quality_spin.value(),
+                dedupe_threshold=self._dedupe_threshold(self.v2g_dedupe_check),
+                use_timestamps=self.v2g_timestamps_check.isChecked(),
+                transform=transform,
+            )
+        self.worker.finished.connect(self._on_task_finished)
+        self.worker.error.connect(self._on_task_error)
+        self.worker.start()
+
+    def _start_gif_to_gif(self):
+        """開始 GIF 最佳化"""
+        input_path = self.g2g_input_edit.text().strip()
+        output_path = self.g2g_output_edit.text().strip()
+
+        if not input_path:
+            QMessageBox.warning(self, "警告", "請選擇輸入動畫檔案")
+            return
+        if not output_path:
+            QMessageBox.warning(self, "警告", "請選擇輸出 GIF 檔案")
+            return
+        if os.path.abspath(input_path) == os.path.abspath(output_path):
+            QMessageBox.warning(self, "警告", "輸出檔案不能與輸入檔案相同")
+            return
+
+        max_width = self.g2g_max_width_spin.value()
+        if max_width == 0:
+            max_width = None
+
+        estimated_bytes = self._estimate_image_animation_bytes([input_path], "gif", max_width)
+        if not self._confirm_memory(estimated_bytes // self.g2g_step_spin.value()):
+            return
+
+        self._begin_task()
 
         self.worker = WorkerThread(
-            VideoConverter.video_to_gif,
-            video_path,
+            VideoConverter.gif_to_gif,
+            input_path,
             output_path,
-            frame_interval,
-            float(fps),
             max_width,
+            self.g2g_step_spin.value(),
+            self.g2g_colors_spin.value(),
+            self.g2g_dither_check.isChecked(),
+            self._dedupe_threshold(self.g2g_dedupe_check),
             self._update_progress,
         )
         self.worker.finished.connect(self._on_task_finished)
@@ -0,0 +1,281 @@
+"""
+媒體探測模組
+
+以容器層級的中繼資料（不解碼影格）取得影片資訊，並依 (路徑, 大小, 修改時間) 快取結果
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import subprocess
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+
+import cv2
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    """影片中繼資料"""
+
+    path: str
+    width: int
+    height: int
+    fps: float
+    frame_count: int
+    duration: float  # 秒
+    codec: str
+    keyframes: tuple[float, ...] = field(default=())  # 關鍵幀時間（秒）
+    exact: bool = False  # frame_count 是否為實際計數（而非估計值）
+
+    def summary(self) -> str:
+        """產生顯示用的摘要文字"""
+        minutes, seconds = divmod(self.duration, 60)
+        parts = [
+            f"{self.width}x{self.height}",
+            f"{self.fps:.2f} fps",
+            f"{self.frame_count} 幀" + ("" if self.exact else " (估計)"),
+            f"{int(minutes):02d}:{seconds:04.1f}",
+            self.codec or "未知編碼",
+        ]
+        if self.keyframes:
+            parts.append(f"{len(self.keyframes)} 個關鍵幀")
+        return " · ".join(parts)
+
+
+def probe_media(path: str) -> MediaInfo:
+    """
+    探測影片中繼資料（結果依檔案路徑、大小與修改時間快取）
+
+    優先使用 ffprobe 掃描封包（只解封裝、不解碼），取得精確幀數與關鍵幀索引；
+    找不到 ffprobe 時改以 imageio-ffmpeg 附帶的 ffmpeg 串流複製掃描封包，
+    兩者皆無法使用時退回 OpenCV 的容器屬性（幀數為估計值）。
+
+    Args:
+        path: 影片檔案路徑
+
+    Returns:
+        影片中繼資料
+    """
+    abs_path = os.path.abspath(path)
+    try:
+        stat = os.stat(abs_path)
+    except OSError as e:
+        raise ValueError(f"無法讀取檔案: {path}") from e
+    return _probe_cached(abs_path, stat.st_size, stat.st_mtime_ns)
+
+
+def estimate_total_frames(path: str, fallback: int = 0) -> int:
+    """
+    取得用於進度顯示的總幀數，探測失敗時回傳 fallback
+
+    Args:
+        path: 影片檔案路徑
+        fallback: 探測失敗時使用的數值（通常為 CAP_PROP_FRAME_COUNT）
+
+    Returns:
+        總幀數
+    """
+    try:
+        info = probe_media(path)
+    except ValueError:
+        return fallback
+    return info.frame_count or fallback
+
+
+def clear_probe_cache() -> None:
+    """清除探測快取"""
+    _probe_cached.cache_clear()
+
+
+@lru_cache(maxsize=256)
+def _probe_cached(path: str, size: int, mtime_ns: int) -> MediaInfo:
+    """實際探測（size 與 mtime_ns 僅作為快取鍵）"""
+    ffprobe = shutil.which("ffprobe")
+    if ffprobe:
+        try:
+            return _probe_with_ffprobe(ffprobe, path)
+        except OSError, ValueError, subprocess.SubprocessError:
+            pass
+    ffmpeg = _bundled_ffmpeg()
+    if ffmpeg:
+        try:
+            return _probe_with_ffmpeg(ffmpeg, path)
+        except OSError, ValueError, subprocess.SubprocessError:
+            pass
+    return _probe_with_opencv(path)
+
+
+def _bundled_ffmpeg() -> str | None:
+    """imageio-ffmpeg 附帶的 ffmpeg 執行檔路徑（找不到時為 None）"""
+    try:
+        import imageio_ffmpeg
+
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except ImportError, RuntimeError:
+        return None
+
+
+def _parse_rate(rate: str | None) -> float:
+    """解析 ffprobe 的分數格式幀率（例如 30000/1001）"""
+    if not rate:
+        return 0.0
+    num, _, den = rate.partition("/")
+    try:
+        value = float(num) / float(den or 1)
+    except ValueError, ZeroDivisionError:
+        return 0.0
+    return value
+
+
+def _probe_with_ffprobe(ffprobe: str, path: str) -> MediaInfo:
+    """使用 ffprobe 掃描視訊串流的封包"""
+    cmd = [
+        ffprobe,
+        "-v",
+        "error",
+        "-select_streams",
+        "v:0",
+        "-show_entries",
+        "stream=codec_name,width,height,avg_frame_rate,r_frame_rate,duration"
+        ":format=duration:packet=pts_time,flags",
+        "-of",
+        "json",
+        path,
+    ]
+    result = subprocess.run(cmd, capture_output=True, check=True, timeout=120)
+    data = json.loads(result.stdout or b"{}")
+
+    streams = data.get("streams") or []
+    if not streams:
+        raise ValueError(f"找不到視訊串流: {path}")
+    stream = streams[0]
+    packets = data.get("packets") or []
+
+    fps = _parse_rate(stream.get("avg_frame_rate")) or _parse_rate(stream.get("r_frame_rate"))
+    duration = float(stream.get("duration") or data.get("format", {}).get("duration") or 0.0)
+    keyframes = tuple(
+        float(p["pts_time"]) for p in packets if "K" in p.get("flags", "") and "pts_time" in p
+    )
+
+    frame_count = len(packets)
+    exact = frame_count > 0
+    if not exact:
+        frame_count = round(duration * fps)
+
+    return MediaInfo(
+        path=path,
+        width=int(stream.get("width") or 0),
+        height=int(stream.get("height") or 0),
+        fps=fps,
+        frame_count=frame_count,
+        duration=duration,
+        codec=stream.get("codec_name", ""),
+        keyframes=keyframes,
+        exact=exact,
+    )
+
+
+def _probe_with_ffmpeg(ffmpeg: str, path: str) -> MediaInfo:
+    """
+    使用 ffmpeg 以串流複製（只解封裝、不解碼）輸出視訊串流每個封包的 framecrc
+
+    framecrc 的每一行為「串流, dts, pts, 時長, 大小, 校驗碼[, F=旗標]」，
+    旗標僅在不是單純關鍵幀時列出；檔頭另含時間基準、編碼與尺寸。
+    """
+    cmd = [
+        ffmpeg,
+        "-hide_banner",
+        "-nostdin",
+        "-v",
+        "error",
+        "-i",
+        path,
+        "-map",
+        "0:v:0",
+        "-c",
+        "copy",
+        "-f",
+        "framecrc",
+        "-",
+    ]
+    result = subprocess.run(cmd, capture_output=True, check=True, timeout=120)
+
+    time_base = 0.0
+    codec = ""
+    width = height = 0
+    frame_count = 0
+    total_duration = 0
+    pts_values: list[int] = []
+    keyframes: list[float] = []
+    for line in result.stdout.decode("utf-8", "replace").splitlines():
+        if line.startswith("#"):
+            key, _, value = line[1:].partition(":")
+            value = value.strip()
+            if key.startswith("tb"):
+                time_base = _parse_rate(value)
+            elif key.startswith("codec_id"):
+                codec = value
+            elif key.startswith("dimensions"):
+                w, _, h = value.partition("x")
+                width, height = int(w), int(h)
+            continue
+        fields = [f.strip() for f in line.split(",")]
+        if len(fields) < 6:
+            continue
+        frame_count += 1
+        pts = int(fields[2])
+        pts_values.append(pts)
+        total_duration += int(fields[3])
+        flags = next((int(f[2:], 16) for f in fields[6:] if f.startswith("F=")), 1)
+        if flags & 1:
+            keyframes.append(pts * time_base)
+
+    if frame_count == 0 or time_base <= 0:
+        raise ValueError(f"找不到視訊串流: {path}")
+    duration = total_duration * time_base
+    if duration <= 0 and frame_count > 1:
+        # 容器未記錄封包時長時，以時間戳範圍推算
+        span = (max(pts_values) - min(pts_values)) * time_base
+        duration = span * frame_count / (frame_count - 1)
+    return MediaInfo(
+        path=path,
+        width=width,
+        height=height,
+        fps=frame_count / duration if duration > 0 else 0.0,
+        frame_count=frame_count,
+        duration=duration,
+        codec=codec,
+        keyframes=tuple(sorted(keyframes)),
+        exact=True,
+    )
+
+
+def _probe_with_opencv(path: str) -> MediaInfo:
+    """使用 OpenCV 讀取容器屬性（不讀取影格）"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError(f"無法開啟影片: {path}")
+
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        frame_count = max(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 0)
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+        codec = "".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00 ")
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    finally:
+        cap.release()
+
+    return MediaInfo(
+        path=path,
+        width=width,
+        height=height,
+        fps=fps,
+        frame_count=frame_count,
+        duration=frame_count / fps if fps > 0 else 0.0,
+        codec=codec.lower() or Path(path).suffix.lstrip(".").lower(),
+    )
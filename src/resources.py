@@ -0,0 +1,229 @@
+"""
+系統資源管理模組
+
+依全域 CPU 預算分配每個轉換任務可用的執行緒數（OpenCV、ffmpeg 與自有的工作執行緒），
+避免多個任務同時執行時過度搶占核心；並依記憶體預算限制每個任務保留在記憶體中的幀
+"""
+
+from __future__ import annotations
+
+import ctypes
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+import cv2
+
+# 背景任務的 nice 值（Linux）
+_BACKGROUND_NICE = 10
+# Windows THREAD_PRIORITY_BELOW_NORMAL
+_THREAD_PRIORITY_BELOW_NORMAL = -1
+# 無法取得實體記憶體大小時的預設記憶體預算
+_FALLBACK_MEMORY_BUDGET = 2 * 1024**3
+# 預設記憶體預算占實體記憶體的比例
+_MEMORY_BUDGET_RATIO = 0.5
+
+
+def total_memory() -> int | None:
+    """取得實體記憶體大小（位元組），無法取得時回傳 None"""
+    try:
+        if sys.platform == "win32":
+
+            class MemoryStatus(ctypes.Structure):
+                _fields_ = [
+                    ("dwLength", ctypes.c_ulong),
+                    ("dwMemoryLoad", ctypes.c_ulong),
+                    ("ullTotalPhys", ctypes.c_ulonglong),
+                    ("ullAvailPhys", ctypes.c_ulonglong),
+                    ("ullTotalPageFile", ctypes.c_ulonglong),
+                    ("ullAvailPageFile", ctypes.c_ulonglong),
+                    ("ullTotalVirtual", ctypes.c_ulonglong),
+                    ("ullAvailVirtual", ctypes.c_ulonglong),
+                    ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+                ]
+
+            status = MemoryStatus()
+            status.dwLength = ctypes.sizeof(MemoryStatus)
+            if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+                return int(status.ullTotalPhys)
+            return None
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except OSError, ValueError, AttributeError:
+        return None
+
+
+def default_memory_budget() -> int:
+    """預設記憶體預算：實體記憶體的一半"""
+    total = total_memory()
+    return int(total * _MEMORY_BUDGET_RATIO) if total else _FALLBACK_MEMORY_BUDGET
+
+
+def estimate_job_bytes(width: int, height: int, frame_count: int, channels: int = 3) -> int:
+    """
+    估算需保留所有幀的任務的記憶體峰值
+
+    Args:
+        width: 輸出寬度
+        height: 輸出高度
+        frame_count: 輸出幀數
+        channels: 每像素位元組數（GIF 調色盤為 1，RGB 為 3，RGBA 為 4）
+
+    Returns:
+        估計的位元組數
+    """
+    return width * height * channels * frame_count
+
+
+def lower_thread_priority() -> bool:
+    """
+    降低目前執行緒的排程優先權
+
+    Linux 的 nice 值以執行緒為單位，之後由此執行緒建立的執行緒與子行程（例如 ffmpeg）
+    也會繼承；Windows 使用 SetThreadPriority。其他平台不支援時不做任何事。
+
+    Returns:
+        是否成功降低優先權
+    """
+    try:
+        if sys.platform.startswith("linux"):
+            tid = threading.get_native_id()
+            current = os.getpriority(os.PRIO_PROCESS, tid)
+            os.setpriority(os.PRIO_PROCESS, tid, max(current, _BACKGROUND_NICE))
+            return True
+        if sys.platform == "win32":
+            kernel32 = ctypes.windll.kernel32
+            return bool(
+                kernel32.SetThreadPriority(
+                    kernel32.GetCurrentThread(), _THREAD_PRIORITY_BELOW_NORMAL
+                )
+            )
+    except OSError, AttributeError:
+        pass
+    return False
+
+
+class ResourceGovernor:
+    """CPU 與記憶體預算管理器"""
+
+    def __init__(
+        self,
+        cpu_budget: int | None = None,
+        job_threads: int | None = None,
+        memory_budget: int | None = None,
+    ):
+        """
+        Args:
+            cpu_budget: 所有任務合計可用的執行緒數（None = CPU 核心數）
+            job_threads: 單一任務最多可用的執行緒數（None = 不限制）
+            memory_budget: 所有任務合計的幀緩衝記憶體預算（位元組，None = 實體記憶體的一半）
+        """
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._active_jobs = 0
+        self.cpu_budget = cpu_budget or os.cpu_count() or 1
+        self.job_threads = job_threads
+        self.memory_budget = memory_budget or default_memory_budget()
+        self.background = False  # 新任務是否預設以低優先權執行
+
+    @property
+    def active_jobs(self) -> int:
+        """執行中的任務數"""
+        return self._active_jobs
+
+    def configure(
+        self,
+        cpu_budget: int | None = None,
+        job_threads: int | None = None,
+        background: bool | None = None,
+        memory_budget: int | None = None,
+    ):
+        """
+        更新設定（對之後開始的任務生效，OpenCV 執行緒數立即重新分配）
+
+        Args:
+            cpu_budget: 所有任務合計可用的執行緒數（None = 不變）
+            job_threads: 單一任務最多可用的執行緒數（0 = 不限制，None = 不變）
+            background: 新任務是否預設以低優先權執行（None = 不變）
+            memory_budget: 幀緩衝記憶體預算（位元組，None = 不變）
+        """
+        with self._lock:
+            if cpu_budget is not None:
+                self.cpu_budget = max(cpu_budget, 1)
+            if job_threads is not None:
+                self.job_threads = job_threads or None
+            if background is not None:
+                self.background = background
+            if memory_budget is not None:
+                self.memory_budget = max(memory_budget, 1)
+            self._apply_opencv()
+
+    def share(self, threads: int | None = None) -> int:
+        """
+        依目前執行中的任務數計算單一任務可用的執行緒數
+
+        Args:
+            threads: 任務自行要求的上限（None = 不限制）
+
+        Returns:
+            執行緒數（至少 1）
+        """
+        share = max(self.cpu_budget // max(self._active_jobs, 1), 1)
+        for limit in (self.job_threads, threads):
+            if limit:
+                share = min(share, limit)
+        return share
+
+    def threads(self) -> int:
+        """目前執行緒所屬任務可用的執行緒數（不在任務中時依目前負載計算）"""
+        return getattr(self._local, "threads", None) or self.share()
+
+    def memory_share(self) -> int:
+        """目前每個任務可用的幀緩衝記憶體（位元組）"""
+        return self.memory_budget // max(self._active_jobs, 1)
+
+    def exceeds_memory(self, estimated_bytes: int) -> bool:
+        """估計用量是否超過開始新任務後每個任務可分得的記憶體"""
+        return estimated_bytes > self.memory_budget // (self._active_jobs + 1)
+
+    def ffmpeg_params(self) -> list[str]:
+        """傳給 ffmpeg 的執行緒參數"""
+        return ["-threads", str(self.threads())]
+
+    @contextmanager
+    def job(self, threads: int | None = None, background: bool | None = None) -> Iterator[int]:
+        """
+        登記一個執行中的任務，並在任務期間於目前執行緒套用執行緒數與優先權
+
+        Args:
+            threads: 此任務自行要求的執行緒上限（None = 不限制）
+            background: 是否以低優先權執行（None = 使用全域設定）
+
+        Yields:
+            此任務可用的執行緒數
+        """
+        with self._lock:
+            self._active_jobs += 1
+            share = self.share(threads)
+            self._apply_opencv()
+
+        if self.background if background is None else background:
+            lower_thread_priority()
+
+        self._local.threads = share
+        try:
+            yield share
+        finally:
+            self._local.threads = None
+            with self._lock:
+                self._active_jobs -= 1
+                self._apply_opencv()
+
+    def _apply_opencv(self):
+        """依任務數分配 OpenCV 的內部執行緒（OpenCV 的設定為整個行程共用）"""
+        cv2.setNumThreads(self.share())
+
+
+# 全域共用的資源管理器
+GOVERNOR = ResourceGovernor()
@@ -0,0 +1,148 @@
+"""
+區域選取對話框
+
+在影片預覽幀上拖曳選取裁切區域
+"""
+
+from __future__ import annotations
+
+import cv2
+from PySide6.QtCore import QPoint, QRect, QSize, Qt
+from PySide6.QtGui import QImage, QMouseEvent, QPixmap
+from PySide6.QtWidgets import (
+    QDialog,
+    QDialogButtonBox,
+    QLabel,
+    QRubberBand,
+    QSlider,
+    QVBoxLayout,
+)
+
+# 預覽區域的最大尺寸
+_PREVIEW_SIZE = QSize(960, 540)
+
+
+class RoiLabel(QLabel):
+    """可拖曳選取矩形的預覽標籤"""
+
+    def __init__(self):
+        super().__init__()
+        self.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
+        self.setCursor(Qt.CursorShape.CrossCursor)
+        self.rubber_band = QRubberBand(QRubberBand.Shape.Rectangle, self)
+        self._origin = QPoint()
+
+    def selection(self) -> QRect | None:
+        """目前選取的矩形（預覽座標）"""
+        if not self.rubber_band.isVisible():
+            return None
+        rect = self.rubber_band.geometry()
+        return rect if rect.width() > 1 and rect.height() > 1 else None
+
+    def set_selection(self, rect: QRect):
+        """顯示指定的選取矩形（預覽座標）"""
+        self.rubber_band.setGeometry(rect.normalized())
+        self.rubber_band.show()
+
+    def _clamp(self, point: QPoint) -> QPoint:
+        """限制座標在預覽圖範圍內"""
+        pixmap = self.pixmap()
+        width = pixmap.width() if pixmap else self.width()
+        height = pixmap.height() if pixmap else self.height()
+        return QPoint(min(max(point.x(), 0), width), min(max(point.y(), 0), height))
+
+    def mousePressEvent(self, event: QMouseEvent):
+        self._origin = self._clamp(event.position().toPoint())
+        self.rubber_band.setGeometry(QRect(self._origin, QSize()))
+        self.rubber_band.show()
+
+    def mouseMoveEvent(self, event: QMouseEvent):
+        point = self._clamp(event.position().toPoint())
+        self.rubber_band.setGeometry(QRect(self._origin, point).normalized())
+
+
+class RoiSelectDialog(QDialog):
+    """裁切區域選取對話框"""
+
+    def __init__(
+        self,
+        video_path: str,
+        crop: tuple[int, int, int, int] | None = None,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.setWindowTitle("選取裁切區域")
+
+        self._cap = cv2.VideoCapture(video_path)
+        if not self._cap.isOpened():
+            raise ValueError(f"無法開啟影片: {video_path}")
+        self._scale = 1.0
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("在畫面上拖曳選取要保留的區域，可拖曳下方滑桿切換預覽幀"))
+
+        self.preview_label = RoiLabel()
+        layout.addWidget(self.preview_label)
+
+        total_frames = max(int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT)), 1)
+        self.frame_slider = QSlider(Qt.Orientation.Horizontal)
+        self.frame_slider.setRange(0, total_frames - 1)
+        self.frame_slider.setValue(total_frames // 2)
+        self.frame_slider.sliderReleased.connect(
+            lambda: self._show_frame(self.frame_slider.value())
+        )
+        layout.addWidget(self.frame_slider)
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self._show_frame(self.frame_slider.value())
+        if crop is not None:
+            x, y, width, height = (round(value * self._scale) for value in crop)
+            self.preview_label.set_selection(QRect(x, y, width, height))
+
+    def _show_frame(self, index: int):
+        """顯示指定幀作為預覽"""
+        self._cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+        ret, frame = self._cap.read()
+        if not ret:
+            return
+
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        height, width = frame_rgb.shape[:2]
+        image = QImage(frame_rgb.data, width, height, width * 3, QImage.Format.Format_RGB888)
+        pixmap = QPixmap.fromImage(image)
+        if width > _PREVIEW_SIZE.width() or height > _PREVIEW_SIZE.height():
+            pixmap = pixmap.scaled(
+                _PREVIEW_SIZE,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation,
+            )
+        self._scale = pixmap.width() / width
+        self.preview_label.setPixmap(pixmap)
+        self.preview_label.setFixedSize(pixmap.size())
+
+    def selected_crop(self) -> tuple[int, int, int, int] | None:
+        """
+        取得選取的裁切區域（影片原始座標）
+
+        Returns:
+            (x, y, 寬, 高) 或 None（未選取）
+        """
+        rect = self.preview_label.selection()
+        if rect is None:
+            return None
+        return (
+            round(rect.x() / self._scale),
+            round(rect.y() / self._scale),
+            round(rect.width() / self._scale),
+            round(rect.height() / self._scale),
+        )
+
+    def done(self, result: int):
+        self._cap.release()
+        super().done(result)
@@ -0,0 +1,447 @@
+"""
+逐幀寫入的動畫輸出模組
+
+Pillow 的多幀存檔會先保留所有幀再寫入，記憶體用量與幀數成正比。
+此模組將每一幀單獨編碼後直接寫入 GIF / APNG / WebP 容器，只保留前一幀用於計算變動區域，
+記憶體用量與幀數無關
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import struct
+import zlib
+from abc import ABC, abstractmethod
+
+from PIL import Image, ImageChops
+
+# 單幀顯示時間上限（WebP 以 24 位元毫秒表示）
+_MAX_WEBP_DURATION = 0xFFFFFF
+
+
+def changed_bbox(previous: Image.Image, current: Image.Image) -> tuple[int, int, int, int] | None:
+    """
+    兩幀之間有變動的區域
+
+    Args:
+        previous: 前一幀
+        current: 目前的幀（與前一幀相同模式與尺寸）
+
+    Returns:
+        (左, 上, 右, 下)，完全相同時為 None
+    """
+    return ImageChops.difference(previous, current).getbbox(alpha_only=False)
+
+
+def remove_partial(path: str):
+    """刪除寫入失敗而未完成的輸出檔"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class StreamWriter(ABC):
+    """逐幀寫入的動畫輸出器基底類別"""
+
+    # 子幀座標是否須為偶數（WebP）
+    even_offsets = False
+
+    def __init__(self, output_path: str, loop: int | None = 0):
+        """
+        Args:
+            output_path: 輸出檔案路徑
+            loop: 循環次數（0 = 無限循環，None = 只播放一次）
+        """
+        self.output_path = output_path
+        self.loop = loop
+        self.frame_count = 0  # 已寫入的幀數
+        self._file = open(output_path, "wb")
+        self._size: tuple[int, int] | None = None
+        self._mode: str | None = None
+        # 上一個加入的完整幀（比對變動區域用）
+        self._previous: Image.Image | None = None
+        # 等待寫入的幀：[圖片, 顯示時間, 變動區域]，下一個不同的幀加入時才寫入，
+        # 以便合併相同的幀並延長顯示時間
+        self._held: list | None = None
+        self._finished = False  # 檔案是否已完整寫入
+
+    @property
+    def _play_count(self) -> int:
+        """APNG / WebP 容器記錄的播放次數（0 = 無限循環）"""
+        return 1 if self.loop is None else self.loop
+
+    def __enter__(self) -> StreamWriter:
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, img: Image.Image, duration: int):
+        """
+        新增一幀
+
+        Args:
+            img: 圖片
+            duration: 顯示時間（毫秒）
+        """
+        if self._size is None:
+            self._size = img.size
+            self._mode = self._frame_mode(img)
+            self._start(img)
+        elif img.size != self._size:
+            raise ValueError(f"幀尺寸不一致：{img.size}，應為 {self._size}")
+
+        img = self._normalize(img)
+        compare = self._comparable(img)
+        full = (0, 0, *img.size)
+        bbox: tuple[int, int, int, int] | None = full
+        if self._previous is not None:
+            bbox = changed_bbox(self._previous, compare)
+            if bbox is None:
+                self.extend(duration)
+                return
+            if not self._crop_allowed():
+                bbox = full
+
+        self._flush_held()
+        self._held = [img, duration, bbox]
+        self._previous = compare
+
+    def extend(self, duration: int):
+        """延長最後一幀的顯示時間"""
+        if self._held is not None:
+            self._held[1] += duration
+
+    def close(self) -> str:
+        """
+        寫入剩餘的幀並完成檔案
+
+        Returns:
+            輸出檔案路徑
+        """
+        try:
+            if self._size is None:
+                raise ValueError("沒有任何幀可輸出")
+            self._flush_held()
+            self._finish()
+        except BaseException:
+            self.abort()
+            raise
+        self._file.close()
+        self._finished = True
+        return self.output_path
+
+    def abort(self):
+        """放棄輸出（關閉並刪除未完成的檔案；已完成的檔案不受影響）"""
+        if self._finished:
+            return
+        self._file.close()
+        remove_partial(self.output_path)
+
+    def _flush_held(self):
+        if self._held is None:
+            return
+        img, duration, (left, top, right, bottom) = self._held
+        self._held = None
+        if self.even_offsets:
+            left, top = left - left % 2, top - top % 2
+        if (left, top, right, bottom) != (0, 0, *img.size):
+            img = img.crop((left, top, right, bottom))
+        self._write_frame(img, duration, (left, top))
+        self.frame_count += 1
+
+    def _frame_mode(self, img: Image.Image) -> str:
+        """依第一幀決定所有幀使用的模式"""
+        has_alpha = img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+        return "RGBA" if has_alpha else "RGB"
+
+    def _normalize(self, img: Image.Image) -> Image.Image:
+        """轉換為輸出使用的模式"""
+        return img if img.mode == self._mode else img.convert(self._mode)
+
+    def _comparable(self, img: Image.Image) -> Image.Image:
+        """用於比對變動區域的圖片"""
+        return img
+
+    def _crop_allowed(self) -> bool:
+        """是否只寫入有變動的區域"""
+        return True
+
+    @abstractmethod
+    def _start(self, first: Image.Image):
+        """寫入檔頭"""
+
+    @abstractmethod
+    def _write_frame(self, img: Image.Image, duration: int, offset: tuple[int, int]):
+        """寫入一幀（img 為變動區域，offset 為其在畫面中的位置）"""
+
+    @abstractmethod
+    def _finish(self):
+        """寫入檔尾並補上檔頭中須於最後才能確定的欄位"""
+
+
+class GifStreamWriter(StreamWriter):
+    """逐幀寫入的 GIF 輸出器，每幀使用各自的區域調色盤"""
+
+    def _frame_mode(self, img: Image.Image) -> str:
+        return img.mode
+
+    def _normalize(self, img: Image.Image) -> Image.Image:
+        # 調色盤模式直接交給 Pillow 編碼，其他模式由 Pillow 存檔時轉換
+        return img
+
+    def _comparable(self, img: Image.Image) -> Image.Image:
+        # 各幀的調色盤不同，需轉為 RGBA 才能比對；
+        # 有透明色的調色盤圖片轉換時 Pillow 會改寫原圖的調色盤，因此先複製
+        if img.mode == "P" and "transparency" in img.info:
+            img = img.copy()
+        return img.convert("RGBA")
+
+    def _crop_allowed(self) -> bool:
+        # 有透明色時每幀都需還原為背景後完整繪製，無法只寫入變動區域
+        return not self._transparent
+
+    def _start(self, first: Image.Image):
+        self._transparent = first.mode in ("RGBA", "LA", "PA") or "transparency" in first.info
+        width, height = self._size
+        # 不使用全域調色盤（色彩解析度 8 位元）
+        self._file.write(b"GIF89a" + struct.pack("<HHBBB", width, height, 0x70, 0, 0))
+        # NETSCAPE2.0 循環次數（沒有此區塊時只播放一次）
+        if self.loop is not None:
+            self._file.write(
+                b"\x21\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", self.loop) + b"\x00"
+            )
+
+    def _write_frame(self, img: Image.Image, duration: int, offset: tuple[int, int]):
+        buffer = io.BytesIO()
+        img.save(buffer, "GIF", optimize=True)
+        color_table, table_bits, transparency, interlace, image_data = _parse_gif(buffer.getvalue())
+
+        # 有透明色時顯示後還原為背景，否則保留（下一幀只覆蓋變動區域）
+        disposal = 2 if self._transparent else 1
+        flags = (disposal << 2) | (1 if transparency is not None else 0)
+        delay = min(round(duration / 10), 0xFFFF)
+        self._file.write(b"\x21\xf9\x04" + struct.pack("<BHBB", flags, delay, transparency or 0, 0))
+        self._file.write(
+            b"\x2c"
+            + struct.pack("<HHHHB", *offset, *img.size, 0x80 | interlace | table_bits)
+            + color_table
+            + image_data
+        )
+
+    def _finish(self):
+        self._file.write(b"\x3b")
+
+
+def _parse_gif(data: bytes) -> tuple[bytes, int, int | None, int, bytes]:
+    """
+    解析單幀 GIF
+
+    Returns:
+        (調色盤, 調色盤大小位元, 透明色索引, 交錯旗標, LZW 影像資料)
+    """
+    flags = data[10]
+    pos = 13
+    color_table, table_bits = b"", 0
+    if flags & 0x80:
+        table_bits = flags & 0x07
+        color_table = data[pos : pos + (3 << (table_bits + 1))]
+        pos += len(color_table)
+
+    transparency = None
+    while pos < len(data):
+        block = data[pos]
+        if block == 0x21:
+            label = data[pos + 1]
+            pos += 2
+            if label == 0xF9 and data[pos + 1] & 0x01:
+                transparency = data[pos + 4]
+            pos = _skip_sub_blocks(data, pos)
+        elif block == 0x2C:
+            image_flags = data[pos + 9]
+            pos += 10
+            if image_flags & 0x80:
+                table_bits = image_flags & 0x07
+                color_table = data[pos : pos + (3 << (table_bits + 1))]
+                pos += len(color_table)
+            start = pos
+            pos = _skip_sub_blocks(data, pos + 1)  # 跳過 LZW 最小碼長
+            return color_table, table_bits, transparency, image_flags & 0x40, data[start:pos]
+        else:
+            break
+    raise ValueError("無法解析 GIF 幀資料")
+
+
+def _skip_sub_blocks(data: bytes, pos: int) -> int:
+    """跳過 GIF 資料子區塊，回傳結尾之後的位置"""
+    while data[pos]:
+        pos += data[pos] + 1
+    return pos + 1
+
+
+class ApngStreamWriter(StreamWriter):
+    """逐幀寫入的 APNG 輸出器"""
+
+    def _start(self, first: Image.Image):
+        self._sequence = 0
+        first = io.BytesIO()
+        Image.new(self._mode, (1, 1)).save(first, "PNG")
+        header = dict(_iter_png_chunks(first.getvalue()))[b"IHDR"]
+        # IHDR 的寬高改為畫布尺寸，其餘（位元深度、色彩類型）與之後的幀相同
+        header = struct.pack(">II", *self._size) + header[8:]
+        self._file.write(b"\x89PNG\r\n\x1a\n" + _png_chunk(b"IHDR", header))
+        # 總幀數在完成時才知道，先寫入佔位的 acTL
+        self._actl_offset = self._file.tell()
+        self._file.write(_png_chunk(b"acTL", struct.pack(">II", 0, self._play_count)))
+
+    def _write_frame(self, img: Image.Image, duration: int, offset: tuple[int, int]):
+        buffer = io.BytesIO()
+        img.save(buffer, "PNG")
+        data = [body for kind, body in _iter_png_chunks(buffer.getvalue()) if kind == b"IDAT"]
+
+        if duration <= 0xFFFF:
+            delay = (duration, 1000)
+        else:
+            delay = (min(round(duration / 10), 0xFFFF), 100)
+        # dispose_op = NONE, blend_op = SOURCE：變動區域直接覆蓋前一幀
+        control = struct.pack(">IIIIIHHBB", self._sequence, *img.size, *offset, *delay, 0, 0)
+        self._file.write(_png_chunk(b"fcTL", control))
+        self._sequence += 1
+
+        for body in data:
+            if self.frame_count == 0:
+                self._file.write(_png_chunk(b"IDAT", body))
+            else:
+                self._file.write(_png_chunk(b"fdAT", struct.pack(">I", self._sequence) + body))
+                self._sequence += 1
+
+    def _finish(self):
+        self._file.write(_png_chunk(b"IEND", b""))
+        self._file.seek(self._actl_offset)
+        self._file.write(
+            _png_chunk(b"acTL", struct.pack(">II", self.frame_count, self._play_count))
+        )
+
+
+def _png_chunk(kind: bytes, body: bytes) -> bytes:
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+
+def _iter_png_chunks(data: bytes):
+    """依序取出 PNG 的 (類型, 內容)"""
+    pos = 8
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[pos : pos + 8])
+        yield kind, data[pos + 8 : pos + 8 + length]
+        pos += 12 + length
+
+
+class WebpStreamWriter(StreamWriter):
+    """逐幀寫入的動態 WebP 輸出器"""
+
+    even_offsets = True
+
+    def __init__(
+        self,
+        output_path: str,
+        loop: int | None = 0,
+        lossless: bool = False,
+        quality: int = 80,
+    ):
+        """
+        Args:
+            output_path: 輸出檔案路徑
+            loop: 循環次數（0 = 無限循環，None = 只播放一次）
+            lossless: 是否使用無損壓縮
+            quality: 有損壓縮品質（0-100）
+        """
+        super().__init__(output_path, loop)
+        self.lossless = lossless
+        self.quality = quality
+
+    def _start(self, first: Image.Image):
+        width, height = self._size
+        flags = 0x02 | (0x10 if self._mode == "RGBA" else 0)  # 動畫、透明
+        header = bytes([flags, 0, 0, 0]) + _uint24(width - 1) + _uint24(height - 1)
+        # RIFF 總長度在完成時填入
+        self._file.write(b"RIFF\0\0\0\0WEBP" + _riff_chunk(b"VP8X", header))
+        # 背景色（透明黑）與循環次數
+        self._file.write(_riff_chunk(b"ANIM", bytes(4) + struct.pack("<H", self._play_count)))
+
+    def _write_frame(self, img: Image.Image, duration: int, offset: tuple[int, int]):
+        buffer = io.BytesIO()
+        img.save(buffer, "WEBP", lossless=self.lossless, quality=self.quality)
+        data = buffer.getvalue()
+        frame_data = b"".join(
+            _riff_chunk(kind, body)
+            for kind, body in _iter_riff_chunks(data)
+            if kind in (b"ALPH", b"VP8 ", b"VP8L")
+        )
+        x, y = offset
+        header = (
+            _uint24(x // 2)
+            + _uint24(y // 2)
+            + _uint24(img.width - 1)
+            + _uint24(img.height - 1)
+            + _uint24(min(duration, _MAX_WEBP_DURATION))
+            # 不混合：變動區域直接覆蓋前一幀；不還原背景
+            + bytes([0x02])
+        )
+        self._file.write(_riff_chunk(b"ANMF", header + frame_data))
+
+    def _finish(self):
+        size = self._file.tell() - 8
+        self._file.seek(4)
+        self._file.write(struct.pack("<I", size))
+
+
+def _uint24(value: int) -> bytes:
+    return value.to_bytes(3, "little")
+
+
+def _riff_chunk(kind: bytes, body: bytes) -> bytes:
+    padding = b"\0" if len(body) % 2 else b""
+    return kind + struct.pack("<I", len(body)) + body + padding
+
+
+def _iter_riff_chunks(data: bytes):
+    """依序取出 WebP 檔案中的 (類型, 內容)"""
+    pos = 12
+    while pos + 8 <= len(data):
+        kind, length = struct.unpack("<4sI", data[pos : pos + 8])
+        yield kind, data[pos + 8 : pos + 8 + length]
+        pos += 8 + length + (length % 2)
+
+
+def open_stream_writer(
+    output_path: str,
+    output_format: str,
+    loop: int | None = 0,
+    lossless: bool = False,
+    quality: int = 80,
+) -> StreamWriter:
+    """
+    建立逐幀寫入的動畫輸出器
+
+    Args:
+        output_path: 輸出檔案路徑
+        output_format: 輸出格式（gif, webp, apng）
+        loop: 循環次數（0 = 無限循環，None = 只播放一次）
+        lossless: WebP 是否使用無損壓縮
+        quality: WebP 品質（0-100）
+
+    Returns:
+        輸出器
+    """
+    if output_format == "gif":
+        return GifStreamWriter(output_path, loop)
+    if output_format == "apng":
+        return ApngStreamWriter(output_path, loop)
+    if output_format == "webp":
+        return WebpStreamWriter(output_path, loop, lossless, quality)
+    raise ValueError(f"不支援的動畫格式: {output_format}")
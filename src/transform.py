@@ -0,0 +1,106 @@
+"""
+影格幾何轉換模組
+
+裁切（感興趣區域）、旋轉與翻轉，在解碼後第一步套用，讓後續的色彩轉換、縮放與編碼只處理較小的區域
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+# 支援的旋轉角度（順時針）與對應的 OpenCV 旋轉代碼
+_ROTATE_CODES = {
+    90: cv2.ROTATE_90_CLOCKWISE,
+    180: cv2.ROTATE_180,
+    270: cv2.ROTATE_90_COUNTERCLOCKWISE,
+}
+# 翻轉方向與對應的 cv2.flip 參數
+_FLIP_CODES = {
+    "h": 1,  # 水平
+    "v": 0,  # 垂直
+    "hv": -1,  # 水平 + 垂直
+}
+
+
+@dataclass(frozen=True)
+class FrameTransform:
+    """影格幾何轉換設定"""
+
+    crop: tuple[int, int, int, int] | None = None  # (x, y, 寬, 高)
+    rotate: int = 0  # 順時針角度：0, 90, 180, 270
+    flip: str | None = None  # "h", "v", "hv"
+
+    def __post_init__(self):
+        if self.rotate % 360 not in (0, *_ROTATE_CODES):
+            raise ValueError(f"不支援的旋轉角度: {self.rotate}")
+        if self.flip is not None and self.flip not in _FLIP_CODES:
+            raise ValueError(f"不支援的翻轉方向: {self.flip}")
+        if self.crop is not None and (self.crop[2] <= 0 or self.crop[3] <= 0):
+            raise ValueError(f"裁切區域的寬高必須大於 0: {self.crop}")
+
+    @property
+    def is_identity(self) -> bool:
+        """是否不做任何轉換"""
+        return self.crop is None and self.rotate % 360 == 0 and self.flip is None
+
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        """
+        套用轉換
+
+        裁切以 NumPy 切片完成，回傳原影格的視圖而不複製資料；
+        旋轉與翻轉只在裁切後的較小區域上執行。
+
+        Args:
+            frame: OpenCV 影格（高 x 寬 x 通道）
+
+        Returns:
+            轉換後的影格
+        """
+        if self.crop is not None:
+            x, y, width, height = self.crop
+            frame_height, frame_width = frame.shape[:2]
+            x0, y0 = min(max(x, 0), frame_width), min(max(y, 0), frame_height)
+            x1, y1 = min(x + width, frame_width), min(y + height, frame_height)
+            if x1 <= x0 or y1 <= y0:
+                raise ValueError(
+                    f"裁切區域 {self.crop} 超出影格範圍 ({frame_width}x{frame_height})"
+                )
+            frame = frame[y0:y1, x0:x1]
+
+        rotate = self.rotate % 360
+        if rotate:
+            frame = cv2.rotate(frame, _ROTATE_CODES[rotate])
+        if self.flip is not None:
+            frame = cv2.flip(frame, _FLIP_CODES[self.flip])
+        return frame
+
+
+def parse_crop(text: str) -> tuple[int, int, int, int] | None:
+    """
+    解析 "x,y,寬,高" 格式的裁切字串
+
+    Args:
+        text: 裁切字串（空字串 = 不裁切）
+
+    Returns:
+        (x, y, 寬, 高) 或 None
+    """
+    text = text.strip()
+    if not text:
+        return None
+    parts = [part.strip() for part in text.replace("，", ",").split(",")]
+    try:
+        values = tuple(int(part) for part in parts)
+    except ValueError:
+        raise ValueError(f"裁切格式錯誤（應為 x,y,寬,高）: {text}") from None
+    if len(values) != 4:
+        raise ValueError(f"裁切格式錯誤（應為 x,y,寬,高）: {text}")
+    return values  # type: ignore[return-value]
+
+
+def format_crop(crop: tuple[int, int, int, int] | None) -> str:
+    """將裁切區域格式化為 "x,y,寬,高" 字串"""
+    return "" if crop is None else ",".join(str(value) for value in crop)
@@ -0,0 +1,605 @@
+"""
+監看資料夾模組
+
+監看資料夾中新出現的影片（Linux 使用 inotify，其他平台輪詢），等檔案寫入完成後
+依資料夾內的規則檔自動執行 video_to_images / video_to_gif，並記錄執行歷史
+"""
+
+from __future__ import annotations
+
+import argparse
+import ctypes
+import ctypes.util
+import fnmatch
+import inspect
+import json
+import logging
+import os
+import select
+import stat
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .converter import VideoConverter
+from .resources import GOVERNOR
+from .transform import FrameTransform
+
+logger = logging.getLogger(__name__)
+
+# 每個監看資料夾內的規則檔名稱
+RULE_FILE_NAME = ".video2img.json"
+# 預設的執行歷史路徑
+DEFAULT_HISTORY_PATH = Path.home() / ".video2img" / "watch_history.jsonl"
+# 預設監看的影片副檔名
+DEFAULT_PATTERNS = ("*.mp4", "*.avi", "*.mov", "*.mkv", "*.wmv", "*.flv", "*.webm", "*.m4v")
+# 支援的操作
+OPERATIONS = ("video_to_images", "video_to_gif")
+# 轉為 FrameTransform 的選項
+_TRANSFORM_OPTIONS = ("crop", "rotate", "flip")
+# 由 run_rule 決定、不可在規則檔中指定的轉換函數參數
+_RESERVED_OPTIONS = ("video_path", "output_dir", "output_path", "progress_callback", "transform")
+
+# inotify 事件（linux/inotify.h）
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_IN_CLOEXEC = 0o2000000
+_IN_NONBLOCK = 0o4000
+_INOTIFY_EVENT = struct.Struct("iIII")
+# 檔案維持不變後仍連續開啟失敗幾次就停止追蹤（之後有變動時會重新追蹤）
+_MAX_OPEN_FAILURES = 10
+
+
+@dataclass(frozen=True)
+class WatchRule:
+    """資料夾規則：哪些檔案要執行哪個操作"""
+
+    operation: str
+    patterns: tuple[str, ...] = DEFAULT_PATTERNS
+    output_dir: str = "converted"  # 相對於監看資料夾
+    options: dict = field(default_factory=dict, hash=False)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> WatchRule:
+        """由規則檔內容建立規則"""
+        operation = data.get("operation")
+        if operation not in OPERATIONS:
+            raise ValueError(f"未知的操作: {operation}（可用：{', '.join(OPERATIONS)}）")
+        patterns = data.get("patterns", DEFAULT_PATTERNS)
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        options = dict(data.get("options", {}))
+        unknown = sorted(set(options) - set(rule_options(operation)))
+        if unknown:
+            raise ValueError(
+                f"{operation} 不支援的選項: {', '.join(unknown)}"
+                f"（可用：{', '.join(rule_options(operation))}）"
+            )
+        return cls(
+            operation=operation,
+            patterns=tuple(patterns),
+            output_dir=data.get("output_dir", "converted"),
+            options=options,
+        )
+
+    def matches(self, path: Path) -> bool:
+        """檔名是否符合規則"""
+        name = path.name.lower()
+        return any(fnmatch.fnmatch(name, pattern.lower()) for pattern in self.patterns)
+
+
+def rule_options(operation: str) -> tuple[str, ...]:
+    """規則檔中此操作可用的選項（依轉換函數的參數）"""
+    parameters = inspect.signature(getattr(VideoConverter, operation)).parameters
+    names = [name for name in parameters if name not in _RESERVED_OPTIONS]
+    return (*names, *_TRANSFORM_OPTIONS)
+
+
+def load_rules(folder: Path) -> list[WatchRule]:
+    """
+    讀取資料夾的規則檔
+
+    規則檔可為單一規則，或 {"rules": [...]} 形式的多條規則；依序比對，第一條符合的規則生效。
+
+    Args:
+        folder: 監看資料夾
+
+    Returns:
+        規則列表（沒有規則檔時為空列表）
+    """
+    rule_path = folder / RULE_FILE_NAME
+    if not rule_path.exists():
+        return []
+    try:
+        data = json.loads(rule_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"無法讀取規則檔 {rule_path}: {e}") from e
+    entries = data.get("rules", [data]) if isinstance(data, dict) else data
+    return [WatchRule.from_dict(entry) for entry in entries]
+
+
+@dataclass(frozen=True)
+class FileKey:
+    """用於判斷檔案是否處理過的識別（路徑、大小、修改時間）"""
+
+    path: str
+    size: int
+    mtime_ns: int
+
+    @classmethod
+    def of(cls, path: Path) -> FileKey:
+        st = path.stat()
+        return cls(str(path.resolve()), st.st_size, st.st_mtime_ns)
+
+
+class RunHistory:
+    """執行歷史，以 JSON Lines 格式持久化，用於去重與吞吐量統計"""
+
+    def __init__(self, history_path: Path):
+        self.history_path = history_path
+        self._lock = threading.Lock()
+        self._processed: set[FileKey] = set()
+        self.records: list[dict] = []
+        if history_path.exists():
+            with history_path.open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.records.append(record)
+                    if record.get("status") == "done":
+                        self._processed.add(
+                            FileKey(record["path"], record["size"], record["mtime_ns"])
+                        )
+
+    def is_processed(self, key: FileKey) -> bool:
+        """
+        檔案是否已成功處理過（同一版本的檔案不會重複處理）
+
+        失敗的紀錄不計入，重新啟動監看或修改規則檔後會再次嘗試。
+        """
+        with self._lock:
+            return key in self._processed
+
+    def record(self, key: FileKey, **fields):
+        """新增一筆執行紀錄"""
+        record = {"path": key.path, "size": key.size, "mtime_ns": key.mtime_ns, **fields}
+        with self._lock:
+            if record.get("status") == "done":
+                self._processed.add(key)
+            self.records.append(record)
+            self.history_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.history_path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def report(self) -> str:
+        """產生吞吐量報告"""
+        with self._lock:
+            records = list(self.records)
+        if not records:
+            return "尚無執行紀錄"
+
+        succeeded = [r for r in records if r.get("status") == "done"]
+        failed = len(records) - len(succeeded)
+        busy_seconds = sum(r.get("seconds", 0.0) for r in succeeded)
+        input_mb = sum(r["size"] for r in succeeded) / 1024**2
+        span = max(r.get("finished", 0.0) for r in records) - min(
+            r.get("started", 0.0) for r in records
+        )
+        lines = [
+            f"處理檔案：{len(records)}（成功 {len(succeeded)}，失敗 {failed}）",
+            f"輸入資料：{input_mb:.1f} MB，轉換耗時合計 {busy_seconds:.1f} 秒",
+        ]
+        if busy_seconds > 0:
+            lines.append(f"單一任務吞吐量：{input_mb / busy_seconds:.2f} MB/秒")
+        if span > 0:
+            lines.append(
+                f"整體吞吐量：{len(succeeded) / span * 3600:.1f} 檔/小時，"
+                f"{input_mb / span:.2f} MB/秒（{span / 3600:.2f} 小時內）"
+            )
+        return "\n".join(lines)
+
+
+class _InotifySource:
+    """以 inotify 取得資料夾內的檔案變動（僅 Linux）"""
+
+    def __init__(self, folders: list[Path]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失敗")
+        self._folders: dict[int, Path] = {}
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_MODIFY
+        for folder in folders:
+            wd = libc.inotify_add_watch(self._fd, os.fsencode(folder), mask)
+            if wd < 0:
+                os.close(self._fd)
+                raise OSError(ctypes.get_errno(), f"無法監看 {folder}")
+            self._folders[wd] = folder
+
+    def wait(self, timeout: float) -> set[Path]:
+        """等待檔案變動，回傳變動的檔案路徑"""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset + _INOTIFY_EVENT.size <= len(data):
+            wd, mask, _cookie, length = _INOTIFY_EVENT.unpack_from(data, offset)
+            offset += _INOTIFY_EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                # 事件佇列溢位時遺失的事件無法得知，重新列出所有資料夾
+                logger.warning("inotify 事件佇列溢位，重新掃描監看資料夾")
+                for folder in self._folders.values():
+                    changed.update(_list_files(folder))
+            elif name and wd in self._folders:
+                changed.add(self._folders[wd] / os.fsdecode(name))
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+class _PollingSource:
+    """定期列出資料夾內容（不支援 inotify 時使用）"""
+
+    def __init__(self, folders: list[Path]):
+        self._folders = folders
+
+    def wait(self, timeout: float) -> set[Path]:
+        time.sleep(timeout)
+        return {path for folder in self._folders for path in _list_files(folder)}
+
+    def close(self):
+        pass
+
+
+def _list_files(folder: Path) -> list[Path]:
+    """列出資料夾第一層的檔案（不含隱藏檔）"""
+    try:
+        return [p for p in folder.iterdir() if p.is_file() and not p.name.startswith(".")]
+    except OSError:
+        return []
+
+
+class HotFolderWatcher:
+    """監看資料夾並自動分派轉換任務"""
+
+    def __init__(
+        self,
+        folders: list[str],
+        workers: int = 2,
+        settle_seconds: float = 5.0,
+        poll_interval: float = 2.0,
+        history_path: Path = DEFAULT_HISTORY_PATH,
+        use_inotify: bool = True,
+    ):
+        """
+        Args:
+            folders: 監看的資料夾
+            workers: 同時執行的轉換任務數
+            settle_seconds: 檔案大小與修改時間需維持不變多久才視為寫入完成
+            poll_interval: 檢查間隔（秒）
+            history_path: 執行歷史檔案路徑
+            use_inotify: 是否在 Linux 上使用 inotify（否則一律輪詢）
+        """
+        self.folders = [Path(folder).resolve() for folder in folders]
+        for folder in self.folders:
+            if not folder.is_dir():
+                raise ValueError(f"找不到資料夾: {folder}")
+
+        self.workers = max(workers, 1)
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.history = RunHistory(history_path)
+        self.use_inotify = use_inotify and sys.platform.startswith("linux")
+
+        # 等待寫入完成的檔案：路徑 -> (大小, 修改時間, 開始維持不變的時間, 開啟失敗次數)
+        self._pending: dict[Path, tuple[int, int, float, int]] = {}
+        # 已寫入完成、等待空閒工作執行緒的檔案
+        self._ready: list[tuple[Path, WatchRule]] = []
+        # 已判斷過的檔案版本：路徑 -> (大小, 修改時間)，未變動時不再重複檢查
+        self._settled: dict[Path, tuple[int, int]] = {}
+        self._running: dict[Future, FileKey] = {}
+        self._rules: dict[Path, tuple[float, list[WatchRule]]] = {}
+        self._stop = threading.Event()
+
+    def stop(self):
+        """要求停止監看（執行中的任務會完成）"""
+        self._stop.set()
+
+    def run(self, once: bool = False):
+        """
+        開始監看，直到呼叫 stop() 或按下 Ctrl+C
+
+        Args:
+            once: 只處理目前已存在的檔案，全部完成後結束
+        """
+        source = self._create_source()
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="watch")
+        logger.info(
+            "開始監看：%s（%s）", ", ".join(map(str, self.folders)), self._source_name(source)
+        )
+
+        for folder in self.folders:
+            for path in _list_files(folder):
+                self._track(path)
+
+        try:
+            while not self._stop.is_set():
+                for path in source.wait(min(self.poll_interval, self.settle_seconds)):
+                    self._track(path)
+                self._refresh_rules()
+                self._check_pending()
+                self._reap()
+                self._dispatch(executor)
+                if once and not (self._pending or self._ready or self._running):
+                    break
+        except KeyboardInterrupt:
+            logger.info("收到中斷，等待執行中的任務完成...")
+        finally:
+            source.close()
+            executor.shutdown(wait=True)
+            self._reap()
+
+    def _create_source(self) -> _InotifySource | _PollingSource:
+        if self.use_inotify:
+            try:
+                return _InotifySource(self.folders)
+            except (OSError, AttributeError) as e:
+                logger.warning("無法使用 inotify，改用輪詢：%s", e)
+        return _PollingSource(self.folders)
+
+    @staticmethod
+    def _source_name(source) -> str:
+        return "inotify" if isinstance(source, _InotifySource) else "輪詢"
+
+    @staticmethod
+    def _rule_mtime(folder: Path) -> float:
+        """規則檔的修改時間（沒有規則檔時為 0）"""
+        try:
+            return (folder / RULE_FILE_NAME).stat().st_mtime
+        except OSError:
+            return 0.0
+
+    def _refresh_rules(self):
+        """規則檔修改後重新讀取，並重新檢查資料夾內的檔案（讓先前失敗的檔案再次嘗試）"""
+        for folder, (mtime, _rules) in list(self._rules.items()):
+            if self._rule_mtime(folder) == mtime:
+                continue
+            self._rules_for(folder)
+            for path in _list_files(folder):
+                self._settled.pop(path, None)
+                self._track(path)
+
+    def _rules_for(self, folder: Path) -> list[WatchRule]:
+        """取得資料夾規則（規則檔修改後自動重新讀取）"""
+        mtime = self._rule_mtime(folder)
+        cached = self._rules.get(folder)
+        if cached is None or cached[0] != mtime:
+            try:
+                rules = load_rules(folder)
+            except ValueError as e:
+                logger.error("%s", e)
+                rules = []
+            self._rules[folder] = (mtime, rules)
+            return rules
+        return cached[1]
+
+    def _match_rule(self, path: Path) -> WatchRule | None:
+        for rule in self._rules_for(path.parent):
+            if rule.matches(path):
+                return rule
+        return None
+
+    def _track(self, path: Path):
+        """開始追蹤可能需要處理的檔案"""
+        if path.name.startswith(".") or path in self._pending:
+            return
+        try:
+            st = path.stat()
+        except OSError:
+            return
+        # 只處理一般檔案（例如建立輸出子資料夾時產生的事件不需追蹤）
+        if not stat.S_ISREG(st.st_mode):
+            return
+        if self._settled.get(path) == (st.st_size, st.st_mtime_ns):
+            return
+        self._settled.pop(path, None)
+        self._pending[path] = (st.st_size, st.st_mtime_ns, time.monotonic(), 0)
+
+    def _check_pending(self):
+        """檔案大小與修改時間維持不變一段時間，且可開啟讀取時，視為寫入完成"""
+        now = time.monotonic()
+        for path, (size, mtime_ns, since, failures) in list(self._pending.items()):
+            try:
+                st = path.stat()
+            except OSError:
+                del self._pending[path]
+                continue
+            if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+                self._pending[path] = (st.st_size, st.st_mtime_ns, now, 0)
+                continue
+            if now - since < self.settle_seconds:
+                continue
+
+            del self._pending[path]
+            if size == 0:
+                # 空檔案視為尚未開始寫入，等之後有變動再重新追蹤
+                self._settled[path] = (size, mtime_ns)
+                continue
+            try:
+                # Windows 上寫入中的檔案通常無法開啟
+                with path.open("rb"):
+                    pass
+            except OSError as e:
+                if failures + 1 < _MAX_OPEN_FAILURES:
+                    self._pending[path] = (size, mtime_ns, since, failures + 1)
+                else:
+                    logger.warning("無法開啟，停止追蹤：%s：%s", path.name, e)
+                continue
+
+            self._settled[path] = (size, mtime_ns)
+            rule = self._match_rule(path)
+            if rule is None:
+                continue
+            key = FileKey.of(path)
+            if self.history.is_processed(key) or key in self._running.values():
+                continue
+            self._ready.append((path, rule))
+
+    def _dispatch(self, executor: ThreadPoolExecutor):
+        """將待處理檔案交給工作執行緒，同時執行的任務數不超過 workers"""
+        while self._ready and len(self._running) < self.workers:
+            path, rule = self._ready.pop(0)
+            try:
+                key = FileKey.of(path)
+            except OSError:
+                continue
+            future = executor.submit(self._process, path, rule, key)
+            self._running[future] = key
+
+    def _reap(self):
+        """移除已完成的任務"""
+        for future in [f for f in self._running if f.done()]:
+            del self._running[future]
+
+    def _process(self, path: Path, rule: WatchRule, key: FileKey):
+        """執行單一轉換任務並記錄結果"""
+        output_dir = path.parent / rule.output_dir
+        started = time.time()
+        begin = time.perf_counter()
+        logger.info("開始處理：%s（%s）", path.name, rule.operation)
+        try:
+            with GOVERNOR.job(background=True):
+                output = run_rule(rule, path, output_dir)
+        except Exception as e:
+            logger.error("處理失敗：%s：%s", path.name, e)
+            self.history.record(
+                key,
+                operation=rule.operation,
+                status="failed",
+                error=str(e),
+                started=started,
+                finished=time.time(),
+                seconds=time.perf_counter() - begin,
+            )
+            return
+
+        seconds = time.perf_counter() - begin
+        logger.info("完成：%s（%.1f 秒）", path.name, seconds)
+        self.history.record(
+            key,
+            operation=rule.operation,
+            status="done",
+            output=output,
+            started=started,
+            finished=time.time(),
+            seconds=seconds,
+        )
+
+
+def run_rule(rule: WatchRule, path: Path, output_dir: Path) -> str:
+    """
+    依規則轉換單一影片
+
+    options 中的 crop / rotate / flip 轉為 FrameTransform，其餘直接傳給轉換函數。
+
+    Args:
+        rule: 規則
+        path: 影片路徑
+        output_dir: 輸出目錄
+
+    Returns:
+        輸出路徑（影片轉圖片時為輸出目錄）
+    """
+    options = dict(rule.options)
+    crop = options.pop("crop", None)
+    transform = FrameTransform(
+        crop=tuple(crop) if crop else None,
+        rotate=options.pop("rotate", 0),
+        flip=options.pop("flip", None),
+    )
+    if not transform.is_identity:
+        options["transform"] = transform
+
+    if rule.operation == "video_to_images":
+        target_dir = output_dir / path.stem
+        VideoConverter.video_to_images(str(path), str(target_dir), **options)
+        return str(target_dir)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = output_dir / f"{path.stem}.gif"
+    return VideoConverter.video_to_gif(str(path), str(output_path), **options)
+
+
+def main(argv: list[str] | None = None):
+    """監看模式命令列入口"""
+    parser = argparse.ArgumentParser(
+        prog="video2img-watch",
+        description=f"監看資料夾並依資料夾內的 {RULE_FILE_NAME} 規則自動轉換新影片",
+    )
+    parser.add_argument("folders", nargs="*", help="要監看的資料夾")
+    parser.add_argument("--workers", type=int, default=2, help="同時執行的轉換任務數（預設 2）")
+    parser.add_argument(
+        "--cpu-budget", type=int, help="所有任務合計使用的執行緒數（預設 CPU 核心數）"
+    )
+    parser.add_argument("--job-threads", type=int, help="單一任務最多使用的執行緒數")
+    parser.add_argument("--memory-budget", type=int, help="幀緩衝記憶體預算（MB）")
+    parser.add_argument(
+        "--settle", type=float, default=5.0, help="檔案維持不變多久視為寫入完成（秒）"
+    )
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="檢查間隔（秒）")
+    parser.add_argument("--no-inotify", action="store_true", help="停用 inotify，一律輪詢")
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY_PATH, help="執行歷史檔案")
+    parser.add_argument("--once", action="store_true", help="處理現有檔案後結束")
+    parser.add_argument("--report", action="store_true", help="顯示執行歷史的吞吐量報告後結束")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.report:
+        print(RunHistory(args.history).report())
+        return
+    if not args.folders:
+        parser.error("請指定至少一個要監看的資料夾")
+
+    GOVERNOR.configure(
+        cpu_budget=args.cpu_budget,
+        job_threads=args.job_threads,
+        background=True,
+        memory_budget=args.memory_budget * 1024 * 1024 if args.memory_budget else None,
+    )
+
+    try:
+        watcher = HotFolderWatcher(
+            args.folders,
+            workers=args.workers,
+            settle_seconds=args.settle,
+            poll_interval=args.poll_interval,
+            history_path=args.history,
+            use_inotify=not args.no_inotify,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    watcher.run(once=args.once)
+    print(watcher.history.report())
+
+
+if __name__ == "__main__":
+    main()
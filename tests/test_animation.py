@@ -0,0 +1,44 @@
+"""animation 模組測試"""
+
+from PIL import Image, ImageDraw
+
+from src.animation import DEFAULT_DEDUPE_THRESHOLD, AnimationWriter
+
+
+def _typing_frames(count: int, size=(1920, 1080)) -> list[Image.Image]:
+    """模擬螢幕錄影中逐字輸入：每幀一行文字往右延伸 60 像素"""
+    frames = []
+    for i in range(count):
+        img = Image.new("RGB", size, "white")
+        ImageDraw.Draw(img).rectangle((100, 500, 100 + 60 * (i + 1), 516), fill="black")
+        frames.append(img)
+    return frames
+
+
+def test_dedupe_keeps_small_local_changes(tmp_path):
+    output = tmp_path / "typing.gif"
+    frames = _typing_frames(10)
+    with AnimationWriter(
+        str(output), "gif", workers=2, dedupe_threshold=DEFAULT_DEDUPE_THRESHOLD
+    ) as writer:
+        for frame in frames:
+            writer.append(frame, 100)
+
+    assert writer.merged_frames == 0
+    with Image.open(output) as img:
+        assert img.n_frames == len(frames)
+
+
+def test_dedupe_merges_identical_frames(tmp_path):
+    output = tmp_path / "still.gif"
+    frame = _typing_frames(1, size=(320, 240))[0]
+    with AnimationWriter(
+        str(output), "gif", workers=2, dedupe_threshold=DEFAULT_DEDUPE_THRESHOLD
+    ) as writer:
+        for _ in range(5):
+            writer.append(frame, 100)
+
+    assert writer.merged_frames == 4
+    with Image.open(output) as img:
+        assert img.n_frames == 1
+        assert img.info["duration"] == 500
@@ -0,0 +1,36 @@
+"""converter 模組測試"""
+
+import pytest
+from PIL import Image
+
+from src.converter import VideoConverter
+from src.resources import GOVERNOR
+
+
+def _save_gif(path, loop: int | None):
+    frames = [Image.new("RGB", (32, 24), (i * 60, 0, 255 - i * 60)) for i in range(4)]
+    options = {} if loop is None else {"loop": loop}
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=100, **options)
+
+
+@pytest.fixture(params=[False, True], ids=["buffered", "streaming"])
+def memory_budget(request):
+    """以預設預算（全部保留於記憶體）及最小預算（逐幀寫入）各執行一次"""
+    budget = GOVERNOR.memory_budget
+    if request.param:
+        GOVERNOR.configure(memory_budget=1)
+    yield
+    GOVERNOR.configure(memory_budget=budget)
+
+
+@pytest.mark.parametrize("loop", [None, 0, 3])
+def test_gif_to_gif_keeps_loop_setting(tmp_path, memory_budget, loop):
+    source = tmp_path / "source.gif"
+    output = tmp_path / "output.gif"
+    _save_gif(source, loop)
+
+    VideoConverter.gif_to_gif(str(source), str(output))
+
+    with Image.open(source) as src, Image.open(output) as out:
+        assert out.info.get("loop") == src.info.get("loop")
+        assert out.n_frames == src.n_frames
@@ -0,0 +1,76 @@
+"""gif_budget 模組測試"""
+
+import numpy as np
+import pytest
+
+from src import gif_budget
+from src.probe import MediaInfo
+
+
+class _FakeCapture:
+    """記錄跳轉位置的假 VideoCapture"""
+
+    def __init__(self, total_frames: int):
+        self.total_frames = total_frames
+        self.position = 0
+        self.seeks: list[int] = []
+
+    def set(self, prop, value):
+        self.position = int(value)
+        self.seeks.append(self.position)
+
+    def read(self):
+        if self.position >= self.total_frames:
+            return False, None
+        self.position += 1
+        return True, np.zeros((36, 64, 3), dtype=np.uint8)
+
+    def release(self):
+        pass
+
+
+def _patch_video(monkeypatch, info: MediaInfo) -> _FakeCapture:
+    cap = _FakeCapture(info.frame_count)
+    monkeypatch.setattr(gif_budget, "probe_media", lambda path: info)
+    monkeypatch.setattr(gif_budget.VideoConverter, "open_video", staticmethod(lambda path: cap))
+    return cap
+
+
+def _info(frame_count: int, keyframes: tuple[float, ...] = ()) -> MediaInfo:
+    return MediaInfo(
+        path="clip.mp4",
+        width=64,
+        height=36,
+        fps=30.0,
+        frame_count=frame_count,
+        duration=frame_count / 30.0,
+        codec="h264",
+        keyframes=keyframes,
+    )
+
+
+def test_sparse_keyframes_keep_distinct_segments(monkeypatch):
+    cap = _patch_video(monkeypatch, _info(9000, keyframes=(0.0, 8.3)))
+
+    samples, total_frames = gif_budget.read_sample_segments("clip.mp4")
+
+    assert total_frames == 9000
+    assert len(samples) == 3
+    # 三段分布於整段影片，而非都集中在開頭的關鍵幀
+    assert len(cap.seeks) == 3
+    assert cap.seeks[-1] > 9000 // 2
+
+
+def test_nearby_keyframe_is_used(monkeypatch):
+    cap = _patch_video(monkeypatch, _info(9000, keyframes=(75.0, 150.0, 225.0)))
+
+    gif_budget.read_sample_segments("clip.mp4")
+
+    assert cap.seeks == [2250, 4500, 6750]
+
+
+def test_unknown_frame_count_fails_early(monkeypatch):
+    _patch_video(monkeypatch, _info(0))
+
+    with pytest.raises(ValueError):
+        gif_budget.read_sample_segments("clip.mp4")
@@ -0,0 +1,45 @@
+"""probe 模組測試"""
+
+import cv2
+import numpy as np
+import pytest
+
+from src import probe
+
+
+@pytest.fixture
+def clip(tmp_path):
+    """以 OpenCV 產生 45 幀、15 fps 的測試影片"""
+    path = tmp_path / "clip.mp4"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 15.0, (64, 48))
+    for i in range(45):
+        writer.write(np.full((48, 64, 3), i * 5, dtype=np.uint8))
+    writer.release()
+    return str(path)
+
+
+def test_bundled_ffmpeg_counts_packets(clip):
+    ffmpeg = probe._bundled_ffmpeg()
+    if ffmpeg is None:
+        pytest.skip("imageio-ffmpeg 未附帶 ffmpeg")
+
+    info = probe._probe_with_ffmpeg(ffmpeg, clip)
+
+    assert info.exact
+    assert info.frame_count == 45
+    assert (info.width, info.height) == (64, 48)
+    assert info.fps == pytest.approx(15.0)
+    assert info.duration == pytest.approx(3.0)
+    assert info.keyframes and info.keyframes[0] == 0.0
+
+
+def test_probe_falls_back_to_bundled_ffmpeg(clip, monkeypatch):
+    if probe._bundled_ffmpeg() is None:
+        pytest.skip("imageio-ffmpeg 未附帶 ffmpeg")
+    monkeypatch.setattr(probe.shutil, "which", lambda name: None)
+    probe.clear_probe_cache()
+
+    info = probe.probe_media(clip)
+
+    assert info.exact
+    assert info.keyframes
@@ -0,0 +1,106 @@
+"""stream_writers 模組與 AnimationWriter 逐幀寫入的測試"""
+
+import pytest
+from PIL import Image
+
+from src.animation import AnimationWriter
+from src.resources import GOVERNOR
+from src.stream_writers import open_stream_writer
+
+
+@pytest.fixture
+def force_streaming():
+    """將記憶體預算設為最小，使 AnimationWriter 從第一幀起即逐幀寫入"""
+    budget = GOVERNOR.memory_budget
+    GOVERNOR.configure(memory_budget=1)
+    yield
+    GOVERNOR.configure(memory_budget=budget)
+
+
+def _frame(shade: int, size=(64, 48)) -> Image.Image:
+    img = Image.new("RGB", size, (shade, 255 - shade, 128))
+    img.paste((255, 255, 255), (shade % 40, 10, shade % 40 + 16, 26))
+    return img
+
+
+@pytest.mark.parametrize("output_format", ["gif", "apng", "webp"])
+def test_abort_removes_partial_file(tmp_path, output_format):
+    output = tmp_path / f"partial.{output_format}"
+    writer = open_stream_writer(str(output), output_format)
+    writer.write(_frame(0), 100)
+    writer.write(_frame(60), 100)
+    writer.abort()
+
+    assert not output.exists()
+
+
+def test_failed_animation_leaves_no_file(tmp_path, force_streaming):
+    output = tmp_path / "failed.gif"
+
+    with pytest.raises(RuntimeError):
+        with AnimationWriter(str(output), "gif", workers=1) as writer:
+            for i in range(4):
+                writer.append(_frame(i * 30), 100)
+            assert writer.streaming
+            raise RuntimeError("中斷")
+
+    assert not output.exists()
+
+
+def test_abort_after_close_keeps_file(tmp_path):
+    output = tmp_path / "done.gif"
+    writer = open_stream_writer(str(output), "gif")
+    writer.write(_frame(0), 100)
+    writer.close()
+    writer.abort()
+
+    assert output.exists()
+
+
+def _read_back(path) -> tuple[list[Image.Image], list[int]]:
+    """讀回動畫的完整畫面與每幀顯示時間"""
+    frames, durations = [], []
+    with Image.open(path) as img:
+        for i in range(img.n_frames):
+            img.seek(i)
+            frames.append(img.convert("RGBA"))
+            durations.append(img.info["duration"])
+    return frames, durations
+
+
+@pytest.mark.parametrize("output_format", ["gif", "apng", "webp"])
+def test_streaming_round_trip(tmp_path, force_streaming, output_format):
+    output = tmp_path / f"round_trip.{output_format}"
+    # 第 3、4 幀相同，應合併為一幀並延長顯示時間
+    shades = [0, 40, 80, 80, 120, 160]
+    with AnimationWriter(str(output), output_format, lossless=True, workers=2) as writer:
+        for shade in shades:
+            writer.append(_frame(shade), 100)
+    assert writer.streaming
+
+    frames, durations = _read_back(output)
+    assert durations == [100, 100, 200, 100, 100]
+    for img, shade in zip(frames, [0, 40, 80, 120, 160]):
+        assert img.convert("RGB").tobytes() == _frame(shade).tobytes()
+
+
+@pytest.mark.parametrize("output_format", ["gif", "apng", "webp"])
+def test_streaming_round_trip_transparent(tmp_path, force_streaming, output_format):
+    output = tmp_path / f"transparent.{output_format}"
+    sources = []
+    for x in range(0, 40, 10):
+        img = Image.new("RGBA", (64, 48), (0, 0, 0, 0))
+        img.paste((200, 30, 30, 255), (x, 8, x + 20, 28))
+        sources.append(img)
+    with AnimationWriter(str(output), output_format, lossless=True, workers=2) as writer:
+        for img in sources:
+            writer.append(img, 80)
+    assert writer.streaming
+
+    frames, durations = _read_back(output)
+    assert durations == [80] * len(sources)
+    for img, source in zip(frames, sources):
+        assert img.getchannel("A").tobytes() == source.getchannel("A").tobytes()
+        opaque = source.getchannel("A")
+        assert img.getbbox() == source.getbbox()
+        assert Image.composite(img, source, opaque).tobytes() == source.tobytes()
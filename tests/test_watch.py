@@ -0,0 +1,83 @@
+"""watch 模組測試"""
+
+import json
+import os
+import sys
+
+import pytest
+
+from src import watch
+from src.watch import RULE_FILE_NAME, FileKey, HotFolderWatcher, RunHistory, WatchRule
+
+
+def test_rule_rejects_unknown_option():
+    with pytest.raises(ValueError, match="max_widht"):
+        WatchRule.from_dict({"operation": "video_to_gif", "options": {"max_widht": 480}})
+
+
+def test_rule_accepts_converter_and_transform_options():
+    rule = WatchRule.from_dict(
+        {
+            "operation": "video_to_gif",
+            "options": {"fps": 10, "max_width": 480, "crop": [0, 0, 8, 8]},
+        }
+    )
+    assert rule.options["fps"] == 10
+
+    with pytest.raises(ValueError):
+        WatchRule.from_dict({"operation": "video_to_images", "options": {"output_path": "x"}})
+
+
+def test_failed_records_are_retried(tmp_path):
+    history_path = tmp_path / "history.jsonl"
+    history = RunHistory(history_path)
+    failed = FileKey("/videos/a.mp4", 10, 1)
+    done = FileKey("/videos/b.mp4", 10, 1)
+    history.record(failed, status="failed", error="TypeError")
+    history.record(done, status="done")
+
+    for loaded in (history, RunHistory(history_path)):
+        assert not loaded.is_processed(failed)
+        assert loaded.is_processed(done)
+
+
+def test_rule_change_rechecks_folder(tmp_path):
+    folder = tmp_path / "inbox"
+    folder.mkdir()
+    video = folder / "clip.mp4"
+    video.write_bytes(b"data")
+    rule_path = folder / RULE_FILE_NAME
+    rule_path.write_text(json.dumps({"operation": "video_to_gif", "options": {"fsp": 10}}))
+
+    watcher = HotFolderWatcher(
+        [str(folder)], history_path=tmp_path / "history.jsonl", use_inotify=False
+    )
+    folder = watcher.folders[0]
+    video = folder / "clip.mp4"
+    assert watcher._match_rule(video) is None
+    watcher._settled[video] = (video.stat().st_size, video.stat().st_mtime_ns)
+
+    rule_path.write_text(json.dumps({"operation": "video_to_gif", "options": {"fps": 10}}))
+    mtime = rule_path.stat().st_mtime + 10
+    os.utime(rule_path, (mtime, mtime))
+    watcher._refresh_rules()
+
+    assert video in watcher._pending
+    assert watcher._match_rule(video) is not None
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify 僅支援 Linux")
+def test_inotify_overflow_rescans_folders(tmp_path, monkeypatch):
+    for name in ("a.mp4", "b.mp4", ".hidden"):
+        (tmp_path / name).write_bytes(b"data")
+    source = watch._InotifySource([tmp_path])
+    overflow = watch._INOTIFY_EVENT.pack(-1, watch._IN_Q_OVERFLOW, 0, 0)
+    monkeypatch.setattr(watch.select, "select", lambda r, w, x, timeout: (r, [], []))
+    monkeypatch.setattr(watch.os, "read", lambda fd, size: overflow)
+    try:
+        changed = source.wait(0)
+    finally:
+        monkeypatch.undo()
+        source.close()
+
+    assert changed == {tmp_path / "a.mp4", tmp_path / "b.mp4"}